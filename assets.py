@@ -0,0 +1,184 @@
+# 资源模块，统一加载resources/images下的图像并转换为显示格式
+#
+# pygame.image.load返回的Surface保持文件原本的像素格式（GIF为8位调色板），
+# 每次blit到屏幕都要逐像素转换格式。这里在加载时调用convert()/convert_alpha()一次，
+# 之后的blit都是同格式拷贝。显示模式尚未设置时（如无界面模拟）保持原格式，
+# 设置显示模式后调用preload()会把已缓存的图像重新转换。
+import os
+
+import pygame
+from game_logging import get_logger
+from settings import IMAGE_MANIFEST, list_images
+
+logger = get_logger("assets")
+
+# 规范化路径 -> 原始尺寸的Surface
+_images = {}
+# (规范化路径, (宽, 高)) -> 缩放后的Surface
+_scaled = {}
+# (规范化路径, 尺寸, 角度) -> 旋转后的Surface
+_rotated = {}
+# 已转换为显示格式的图像路径
+_converted = set()
+# 纹理图集及 规范化路径 -> 图集中的子矩形
+_atlas = None
+_atlas_rects = {}
+
+
+def normalize_path(image_name):
+    """
+    统一图像路径格式，"./resources/images/a.gif"与"resources/images/a.gif"视为同一图像
+    """
+    return os.path.normpath(image_name).replace(os.sep, "/")
+
+
+def display_ready():
+    """
+    是否已设置显示模式，只有设置后才能转换为显示格式
+    """
+    return pygame.display.get_init() and pygame.display.get_surface() is not None
+
+
+def _to_display_format(image):
+    """
+    带逐像素透明度的图像用convert_alpha()，其余用convert()（保留colorkey）
+    """
+    if image.get_flags() & pygame.SRCALPHA:
+        return image.convert_alpha()
+    return _rle(image.convert())
+
+
+def _rle(image):
+    """
+    colorkey图像启用RLE加速，blit时整段跳过透明像素
+    """
+    colorkey = image.get_colorkey()
+    if colorkey is not None:
+        image.set_colorkey(colorkey, pygame.RLEACCEL)
+    return image
+
+
+def _load(path):
+    image = pygame.image.load(path)
+    if display_ready():
+        image = _to_display_format(image)
+        _converted.add(path)
+    return image
+
+
+def get_image(image_name, size=None):
+    """
+    返回图像，size不为None时返回缩放到该尺寸的图像；同一图像和尺寸只加载、缩放一次
+    加载失败时抛出pygame.error或FileNotFoundError
+    """
+    path = normalize_path(image_name)
+    image = _images.get(path)
+    if image is None or (path not in _converted and display_ready()):
+        image = _images[path] = _load(path)
+        # 原图重新转换后，旧的缩放结果也需要重新生成
+        for cache in (_scaled, _rotated):
+            for key in [key for key in cache if key[0] == path]:
+                del cache[key]
+        logger.debug("成功加载图像: %s", path)
+    if path in _atlas_rects:
+        image = _atlas.subsurface(_atlas_rects[path])
+
+    if size is None or image.get_size() == tuple(size):
+        return image
+    key = (path, tuple(size))
+    scaled = _scaled.get(key)
+    if scaled is None:
+        scaled = pygame.transform.scale(image, size)
+        if path in _converted:
+            scaled = _rle(scaled)
+        _scaled[key] = scaled
+    return scaled
+
+
+def get_rotated(image_name, angle, size=None):
+    """
+    返回逆时针旋转angle度（90的倍数）后的图像，所有使用者共享同一个Surface
+    """
+    image = get_image(image_name, size)
+    angle %= 360
+    if not angle:
+        return image
+    key = (normalize_path(image_name), None if size is None else tuple(size), angle)
+    rotated = _rotated.get(key)
+    if rotated is None:
+        rotated = pygame.transform.rotate(image, angle)
+        if key[0] in _converted:
+            rotated = _rle(rotated)
+        _rotated[key] = rotated
+    return rotated
+
+
+def preload(names=tuple(IMAGE_MANIFEST), atlas=False):
+    """
+    加载（或重新转换）资源清单中的所有游戏图像，应在pygame.display.set_mode()之后调用
+    atlas为True时把所有原始尺寸的图像打包到一张纹理图集中，返回加载的图像数量
+    """
+    count = 0
+    for name in names:
+        for path in list_images(name):
+            try:
+                get_image(path)
+                count += 1
+            except (pygame.error, FileNotFoundError) as e:
+                logger.warning("无法加载图像 %s: %s", path, e)
+    if atlas:
+        build_atlas()
+    logger.info("已加载 %d 张图像", count)
+    return count
+
+
+def build_atlas(padding=1):
+    """
+    按高度从大到小逐行排列（shelf packing），把已加载的图像拷贝到一张图集上
+    之后get_image()返回图集的子Surface；图集统一使用逐像素透明度
+    """
+    global _atlas
+    paths = sorted(_images, key=lambda path: _images[path].get_height(), reverse=True)
+    if not paths:
+        return None
+    width = max(256, max(_images[path].get_width() for path in paths) + padding)
+    rects = {}
+    x = y = shelf_height = 0
+    for path in paths:
+        w, h = _images[path].get_size()
+        if x + w > width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        rects[path] = pygame.Rect(x, y, w, h)
+        x += w + padding
+        shelf_height = max(shelf_height, h)
+
+    atlas = pygame.Surface((width, y + shelf_height), pygame.SRCALPHA)
+    if display_ready():
+        atlas = atlas.convert_alpha()
+    atlas.fill((0, 0, 0, 0))
+    for path, rect in rects.items():
+        # colorkey对应的像素不会被拷贝，在图集中保持完全透明
+        atlas.blit(_images[path], rect)
+
+    _atlas = atlas
+    _atlas_rects.clear()
+    _atlas_rects.update(rects)
+    _scaled.clear()
+    _rotated.clear()
+    logger.debug("纹理图集 %dx%d，共 %d 张图像", atlas.get_width(), atlas.get_height(), len(rects))
+    return atlas
+
+
+def clear():
+    """
+    清空所有缓存的图像
+    """
+    global _atlas
+    _images.clear()
+    _scaled.clear()
+    _rotated.clear()
+    _converted.clear()
+    _atlas = None
+    _atlas_rects.clear()
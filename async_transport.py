@@ -0,0 +1,348 @@
+# 异步网络传输模块，在单个事件循环线程中管理所有TCP连接和UDP端点
+#
+# 所有socket读写都在事件循环线程中完成，游戏主循环只通过线程安全的接口交互：
+#   - send/broadcast/close 通过call_soon_threadsafe投递到事件循环线程
+#   - 收到的消息和连接事件放入queue.Queue，由游戏主循环通过get_events()取出
+import asyncio
+import itertools
+import json
+import queue
+import threading
+
+from framing import LineFramer, LengthPrefixFramer, encode_line, encode_length_prefixed
+from game_logging import get_logger
+
+logger = get_logger("async_transport")
+
+# 分帧方式：换行分隔的JSON 或 4字节长度前缀的JSON
+LINE_FRAMING = "line"
+LENGTH_FRAMING = "length"
+
+FRAMERS = {
+    LINE_FRAMING: (LineFramer, encode_line),
+    LENGTH_FRAMING: (LengthPrefixFramer, encode_length_prefixed)
+}
+
+# 事件类型
+EVENT_ACCEPTED = "accepted"    # 服务器接受了新连接
+EVENT_CONNECTED = "connected"  # 主动连接成功
+EVENT_MESSAGE = "message"      # 收到一条消息
+EVENT_CLOSED = "closed"        # 连接已关闭
+EVENT_DATAGRAM = "datagram"    # 收到一个UDP数据包，payload为 (data, addr)
+
+
+class _Connection(asyncio.BufferedProtocol):
+    """
+    单个TCP连接的协议对象，只在事件循环线程中使用
+    事件循环通过get_buffer()/buffer_updated()把数据直接recv_into到分帧缓冲区
+    """
+    def __init__(self, owner, accepted):
+        self.owner = owner
+        self.accepted = accepted
+        self.conn_id = next(owner._ids)
+        self.transport = None
+        self.framer = FRAMERS[owner.framing][0]()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.owner._connections[self.conn_id] = self
+        event = EVENT_ACCEPTED if self.accepted else EVENT_CONNECTED
+        self.owner._emit(event, self.conn_id, transport.get_extra_info("peername"))
+
+    def get_buffer(self, sizehint):
+        return self.framer.writable()
+
+    def buffer_updated(self, nbytes):
+        self.framer.commit(nbytes)
+        try:
+            for frame in self.framer.frames():
+                try:
+                    message = json.loads(str(frame, "utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    logger.warning("收到无效的JSON消息: %r", bytes(frame))
+                    continue
+                self.owner._emit(EVENT_MESSAGE, self.conn_id, message)
+        except ValueError as e:
+            # 帧长度异常，无法再同步分帧，断开连接
+            logger.warning("连接 %s 分帧错误: %s", self.conn_id, e)
+            self.transport.close()
+
+    def connection_lost(self, exc):
+        self.owner._connections.pop(self.conn_id, None)
+        if exc is not None:
+            logger.warning("连接 %s 异常断开: %s", self.conn_id, exc)
+        self.owner._emit(EVENT_CLOSED, self.conn_id, None)
+
+    def send(self, message):
+        if self.transport is None or self.transport.is_closing():
+            return
+        self.transport.write(self.owner.encode(message))
+
+
+class _Datagram(asyncio.DatagramProtocol):
+    """
+    UDP端点的协议对象，只在事件循环线程中使用
+    """
+    def __init__(self, owner):
+        self.owner = owner
+
+    def datagram_received(self, data, addr):
+        self.owner._emit(EVENT_DATAGRAM, None, (data, addr))
+
+    def error_received(self, exc):
+        # UDP是不可靠通道，ICMP错误（如对端端口未开放）只记录不处理
+        logger.debug("UDP错误: %s", exc)
+
+
+class AsyncTransport:
+    """
+    基于asyncio的TCP传输层
+    在一个后台线程中运行事件循环，可同时服务多个连接而不需要每个连接一个线程
+
+    handler(event, conn_id, payload) 在事件循环线程中调用，
+    返回True表示事件已处理，否则事件会放入线程安全的队列等待get_events()取出
+    """
+    def __init__(self, framing=LINE_FRAMING, handler=None):
+        self.framing = framing
+        self.handler = handler
+        self.loop = None
+        self.thread = None
+        self.events = queue.Queue()
+        self._ids = itertools.count(1)
+        self._connections = {}  # conn_id -> _Connection，只在事件循环线程中修改
+        self._servers = []
+        self._datagram = None  # UDP端点
+
+    # ---------- 生命周期 ----------
+
+    def start(self):
+        """
+        启动事件循环线程，重复调用无副作用
+        """
+        if self.loop is not None:
+            return
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            self.loop.run_forever()
+            # 让connection_lost等回调有机会执行后再关闭事件循环
+            self.loop.run_until_complete(asyncio.sleep(0))
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, name="AsyncTransport", daemon=True)
+        self.thread.start()
+        ready.wait()
+
+    def stop(self, timeout=1.0):
+        """
+        关闭所有服务器和连接，停止事件循环线程
+        """
+        if self.loop is None:
+            return
+
+        async def shutdown():
+            for server in self._servers:
+                server.close()
+            for connection in list(self._connections.values()):
+                connection.transport.close()
+            self._servers.clear()
+            if self._datagram is not None:
+                self._datagram.close()
+                self._datagram = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout)
+        except Exception as e:
+            logger.warning("关闭连接时出错: %s", e)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+        self.loop = None
+        self.thread = None
+
+    @property
+    def running(self):
+        return self.loop is not None
+
+    # ---------- 以下方法可在任意线程调用 ----------
+
+    def listen(self, host, port, backlog=5, timeout=5.0):
+        """
+        开始监听端口，失败时抛出异常
+        """
+        self.start()
+
+        async def create_server():
+            server = await self.loop.create_server(
+                lambda: _Connection(self, accepted=True), host, port,
+                backlog=backlog, reuse_address=True)
+            self._servers.append(server)
+            return server
+
+        return asyncio.run_coroutine_threadsafe(create_server(), self.loop).result(timeout)
+
+    def connect(self, host, port, timeout=5.0):
+        """
+        连接到远程主机，返回连接编号，失败时抛出异常
+        """
+        self.start()
+        coro = self.loop.create_connection(lambda: _Connection(self, accepted=False), host, port)
+        _, protocol = asyncio.run_coroutine_threadsafe(
+            asyncio.wait_for(coro, timeout), self.loop).result(timeout + 1.0)
+        return protocol.conn_id
+
+    def open_datagram(self, local_addr=None, remote_addr=None, timeout=5.0):
+        """
+        打开UDP端点；指定remote_addr时为已连接的UDP socket，失败时抛出异常
+        """
+        self.start()
+
+        async def create_endpoint():
+            transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: _Datagram(self), local_addr=local_addr, remote_addr=remote_addr)
+            self._datagram = transport
+
+        asyncio.run_coroutine_threadsafe(create_endpoint(), self.loop).result(timeout)
+
+    @property
+    def has_datagram(self):
+        return self._datagram is not None
+
+    def send_datagram(self, data, addr=None):
+        """
+        发送UDP数据包；已连接的UDP端点addr传None
+        """
+        if self.loop is None or self._datagram is None:
+            return False
+        self.loop.call_soon_threadsafe(self._send_datagram, data, addr)
+        return True
+
+    def send(self, conn_id, message):
+        """
+        发送消息到指定连接
+        """
+        if self.loop is None:
+            return False
+        self.loop.call_soon_threadsafe(self._send, conn_id, message)
+        return True
+
+    def broadcast(self, message, exclude=None):
+        """
+        发送消息到所有连接
+        """
+        if self.loop is None:
+            return False
+        self.loop.call_soon_threadsafe(self._broadcast, message, tuple(exclude or ()))
+        return True
+
+    def broadcast_raw(self, data, exclude=None):
+        """
+        把已编码好的字节（可包含多条消息）一次性写到所有连接
+        """
+        if self.loop is None:
+            return False
+        self.loop.call_soon_threadsafe(self._broadcast_raw, data, tuple(exclude or ()))
+        return True
+
+    def call_later(self, delay, func, *args):
+        """
+        在事件循环线程中延迟执行func
+        """
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.call_later, delay, func, *args)
+
+    def call_soon(self, func, *args):
+        """
+        在事件循环线程中执行func，用于访问只在事件循环线程中修改的数据
+        """
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(func, *args)
+
+    def close(self, conn_id):
+        """
+        关闭指定连接
+        """
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._close, conn_id)
+
+    def get_events(self):
+        """
+        取出所有待处理的事件 (event, conn_id, payload)
+        """
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    @property
+    def connection_count(self):
+        """
+        当前连接数量
+        """
+        return len(self._connections)
+
+    def encode(self, message):
+        """
+        按分帧方式把消息编码为字节
+        """
+        return FRAMERS[self.framing][1](json.dumps(message).encode("utf-8"))
+
+    # ---------- 以下方法只在事件循环线程中调用 ----------
+
+    def send_now(self, conn_id, message):
+        """
+        在事件循环线程中直接发送（供handler使用）
+        """
+        self._send(conn_id, message)
+
+    def broadcast_now(self, message, exclude=()):
+        """
+        在事件循环线程中直接广播（供handler使用）
+        """
+        self._broadcast(message, exclude)
+
+    def _send(self, conn_id, message):
+        connection = self._connections.get(conn_id)
+        if connection is not None:
+            connection.send(message)
+
+    def _broadcast(self, message, exclude):
+        data = None
+        for conn_id, connection in list(self._connections.items()):
+            if conn_id in exclude or connection.transport.is_closing():
+                continue
+            if data is None:
+                data = self.encode(message)
+            connection.transport.write(data)
+
+    def _send_datagram(self, data, addr):
+        if self._datagram is None or self._datagram.is_closing():
+            return
+        if addr is None:
+            self._datagram.sendto(data)
+        else:
+            self._datagram.sendto(data, addr)
+
+    def _broadcast_raw(self, data, exclude):
+        for conn_id, connection in list(self._connections.items()):
+            if conn_id in exclude or connection.transport.is_closing():
+                continue
+            connection.transport.write(data)
+
+    def _close(self, conn_id):
+        connection = self._connections.get(conn_id)
+        if connection is not None:
+            connection.transport.close()
+
+    def _emit(self, event, conn_id, payload):
+        if self.handler is not None:
+            try:
+                if self.handler(event, conn_id, payload):
+                    return
+            except Exception as e:
+                logger.warning("处理网络事件失败: %s", e)
+        self.events.put((event, conn_id, payload))
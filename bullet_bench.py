@@ -0,0 +1,55 @@
+# 子弹模拟性能测试模块，对比GameEngine逐个更新Bullet对象与NumPy子弹池BulletPool
+#
+# 两种方式都由GameEngine.update()驱动，使用同一张地图和同一组随机子弹（位置、方向、发射者相同），
+# 每帧都完成移动、寿命、出界剔除和撞墙（含摧毁红墙）处理，统计平均每帧耗时。
+import os
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import sys
+import time
+
+from bullet_pool import HAS_NUMPY
+from tests.engine_helpers import new_engine, random_bullets
+
+
+def run_engine(specs, ticks, numpy_bullets):
+    """
+    用GameEngine.update()模拟ticks帧，numpy_bullets选择子弹的模拟方式：
+    False时每颗子弹一个Bullet对象（存放在引擎的子弹池中）逐个更新，True时由BulletPool批量模拟，
+    两种方式的结果（子弹顺序、状态和剩余墙壁）完全相同
+    """
+    engine = new_engine(numpy_bullets)
+    # 两种子弹池的spawn()参数相同
+    bullets = engine.bullet_pool if numpy_bullets else engine.bullets
+    for spec in specs:
+        bullets.spawn(*spec)
+    start = time.perf_counter()
+    for _ in range(ticks):
+        # 子弹寿命只有60帧，每帧补充子弹使数量保持稳定
+        for spec in specs[:len(specs) - len(bullets)]:
+            bullets.spawn(*spec)
+        engine.update()
+    return time.perf_counter() - start, len(engine.walls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="子弹模拟性能测试")
+    parser.add_argument("--count", type=int, default=5000, help="同时存在的子弹数量")
+    parser.add_argument("--ticks", type=int, default=300, help="模拟的帧数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    args = parser.parse_args()
+    if not HAS_NUMPY:
+        sys.exit("需要安装numpy: pip install numpy")
+
+    specs = random_bullets(args.count, args.seed)
+    for name, numpy_bullets in (("Bullet对象", False), ("BulletPool", True)):
+        elapsed, walls = run_engine(specs, args.ticks, numpy_bullets)
+        print(f"{name}: 每帧 {elapsed / args.ticks * 1000:.2f} ms，剩余墙壁 {walls}")
+
+
+if __name__ == "__main__":
+    main()
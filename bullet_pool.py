@@ -0,0 +1,321 @@
+# 子弹池模块，用NumPy数组（结构数组，SoA）批量模拟大量子弹
+#
+# GameEngine中每颗子弹都是一个Bullet对象，每帧逐个调用update()再从列表中移除失效的子弹，
+# 几千颗子弹时Python层的循环成为瓶颈。BulletPool把位置、方向、寿命和发射者分别存放在
+# 连续的数组中，每帧用少量数组运算完成移动、寿命、出界和撞墙判断。
+#
+# 移动与失效规则与game_engine.Bullet.update()一致；碰撞与GameEngine._first_bullet_hit()一样
+# 沿子弹本帧移动的路径（扫掠区域）检测，移动前已重叠、移动后已离开的物体不算命中。
+# 撞墙判断使用按格子划分的布尔占用网格（可由GameEngine的格子材质用blocking_grid()生成），
+# 墙壁位于格子左上角、边长为wall_size，与Wall的矩形相同，一颗子弹同时碰到几块墙时
+# 按先行后列的顺序取第一块，与GameEngine相同。
+# 同一帧内多颗子弹击中同一块可摧毁的墙时，只有第一颗被挡住并摧毁墙壁，后面的子弹按
+# 墙壁已被摧毁重新判断，这部分子弹很少，逐个处理。
+# 没有撞墙的子弹再与坦克等目标检测，同样按子弹顺序逐个处理，目标被摧毁后不再被击中。
+# 失效的子弹与EntityPool一样按删除顺序用最后一颗子弹填补空位，子弹顺序与GameEngine中一致，
+# 因此"第一颗"子弹也相同。GameEngine(numpy_bullets=True)用它代替Bullet对象模拟子弹。
+#
+# NumPy是可选依赖，未安装时HAS_NUMPY为False，创建BulletPool会抛出ImportError。
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from settings import Settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+# 方向 -> 每帧移动的单位向量
+DIRECTION_VECTORS = {
+    "up": (0, -1),
+    "down": (0, 1),
+    "left": (-1, 0),
+    "right": (1, 0)
+}
+
+# 单位向量 -> 方向，用于导出子弹状态
+VECTOR_DIRECTIONS = {vector: direction for direction, vector in DIRECTION_VECTORS.items()}
+
+
+def blocking_grid(tiles, columns, material_flags, flag):
+    """
+    由GameEngine.tiles（按行保存的格子材质编号）生成 (行, 列) 布尔网格，
+    材质带有flag标志的格子为True；material_flags为 材质编号 -> 标志 的查找表
+    """
+    materials = np.frombuffer(tiles, dtype=np.uint8).reshape(-1, columns)
+    return (np.frombuffer(material_flags, dtype=np.uint8)[materials] & flag) != 0
+
+
+class BulletPool:
+    """
+    结构数组形式的子弹池
+    有效子弹始终位于各数组的前count项，容量不足时按两倍扩容
+    """
+    def __init__(self, capacity=1024, bullet_size=10, wall_size=30,
+                 tile_size=Settings.BOX_SIZE, bounds=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        if np is None:
+            raise ImportError("BulletPool需要安装numpy")
+        self.bullet_size = bullet_size
+        self.wall_size = wall_size
+        self.tile_size = tile_size
+        self.bounds = bounds
+        self.count = 0
+        # 发射者ID -> 整数编号，数组中只保存编号
+        self.owner_codes = {}
+        self.owners = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """
+        分配（或扩容）数组，保留已有的子弹
+        """
+        old = getattr(self, "x", None)
+        arrays = {
+            "x": np.int32,
+            "y": np.int32,
+            "dx": np.int8,
+            "dy": np.int8,
+            "speed": np.int16,
+            "lifetime": np.int16,
+            "owner": np.int32
+        }
+        for name, dtype in arrays.items():
+            array = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def owner_code(self, owner_id):
+        code = self.owner_codes.get(owner_id)
+        if code is None:
+            code = self.owner_codes[owner_id] = len(self.owners)
+            self.owners.append(owner_id)
+        return code
+
+    def spawn(self, x, y, direction, owner_id, speed=6, lifetime=60):
+        """
+        发射一颗子弹，参数与game_engine.Bullet相同，返回子弹在池中的下标
+        """
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.dx[i], self.dy[i] = DIRECTION_VECTORS[direction]
+        self.speed[i] = speed
+        self.lifetime[i] = lifetime
+        self.owner[i] = self.owner_code(owner_id)
+        self.count += 1
+        return i
+
+    def clear(self):
+        self.count = 0
+
+    def step(self, solid=None, destructible=None, targets=()):
+        """
+        推进一帧：移动、减少寿命、剔除出界和到期的子弹，solid不为None时检测撞墙，再检测targets
+        destructible为可摧毁墙壁的 (行, 列) 布尔网格，其中的墙壁被第一颗子弹击中后视为已摧毁
+        targets为 (矩形, 不会被其击中的发射者ID, 最多被击中的次数) 的列表（如坦克），
+        子弹同时碰到墙壁和目标时墙壁优先，同时碰到几个目标时取列表中的第一个
+        返回 (被击中墙壁的列数组, 行数组, 每个目标被击中的次数列表)，不可摧毁的格子可能出现多次
+        """
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        x += self.dx[:n] * self.speed[:n]
+        y += self.dy[:n] * self.speed[:n]
+        lifetime = self.lifetime[:n]
+        lifetime -= 1
+
+        width, height = self.bounds
+        alive = (lifetime > 0) & (x >= 0) & (x <= width) & (y >= 0) & (y <= height)
+
+        hit = np.zeros(n, dtype=bool)
+        hit_cols = hit_rows = np.zeros(0, dtype=np.intp)
+        if solid is not None and n:
+            hit, hit_cols, hit_rows = self._wall_hits(solid, alive, destructible)
+        target_hit, target_counts = self._target_hits(targets, alive & ~hit)
+
+        # 与GameEngine的删除顺序相同：先删除到期和出界的子弹，再按顺序删除击中物体的子弹
+        self._remove(np.concatenate((np.flatnonzero(~alive), np.flatnonzero(hit | target_hit))))
+        return hit_cols, hit_rows, target_counts
+
+    def _path_hits(self, index, left, top, width, height):
+        """
+        index处的子弹本帧移动的路径是否碰到矩形 (left, top, width, height)：
+        移动前后两个位置的并集与矩形重叠，并且不是移动前重叠、移动后已离开
+        index可以是下标、下标数组或切片，矩形参数可以是与之对应的数组
+        """
+        size = self.bullet_size
+        x = self.x[index]
+        y = self.y[index]
+        x0 = x - self.dx[index] * self.speed[index]
+        y0 = y - self.dy[index] * self.speed[index]
+        right = left + width
+        bottom = top + height
+        before = (x0 < right) & (x0 + size > left) & (y0 < bottom) & (y0 + size > top)
+        after = (x < right) & (x + size > left) & (y < bottom) & (y + size > top)
+        swept = ((np.minimum(x0, x) < right) & (np.maximum(x0, x) + size > left) &
+                 (np.minimum(y0, y) < bottom) & (np.maximum(y0, y) + size > top))
+        return swept & (after | ~before)
+
+    def _path_range(self, index):
+        """
+        index处的子弹本帧移动路径覆盖的格子范围 (首列, 末列, 首行, 末行)
+        """
+        size = self.bullet_size
+        tile = self.tile_size
+        x = self.x[index]
+        y = self.y[index]
+        x0 = x - self.dx[index] * self.speed[index]
+        y0 = y - self.dy[index] * self.speed[index]
+        return (np.minimum(x0, x) // tile, (np.maximum(x0, x) + size - 1) // tile,
+                np.minimum(y0, y) // tile, (np.maximum(y0, y) + size - 1) // tile)
+
+    def _wall_hits(self, solid, alive, destructible=None):
+        """
+        按先行后列的顺序检查子弹移动路径覆盖的格子中的墙壁是否在路径上
+        返回 (命中掩码, 命中格子的列, 命中格子的行)，每颗子弹只记录第一个命中的格子
+        """
+        n = self.count
+        tile = self.tile_size
+        rows, columns = solid.shape
+        col0, col1, row0, row1 = self._path_range(slice(0, n))
+
+        hit = np.zeros(n, dtype=bool)
+        hit_col = np.zeros(n, dtype=np.intp)
+        hit_row = np.zeros(n, dtype=np.intp)
+        if not alive.any():
+            return hit, hit_col[hit], hit_row[hit]
+        span_rows = int((row1 - row0)[alive].max()) + 1
+        span_cols = int((col1 - col0)[alive].max()) + 1
+        for r in range(span_rows):
+            row = row0 + r
+            for c in range(span_cols):
+                col = col0 + c
+                inside = (alive & ~hit & (row <= row1) & (col <= col1) &
+                          (col >= 0) & (col < columns) & (row >= 0) & (row < rows))
+                candidates = np.flatnonzero(inside)
+                if not len(candidates):
+                    continue
+                candidates = candidates[solid[row[candidates], col[candidates]]]
+                found = candidates[self._path_hits(candidates, col[candidates] * tile,
+                                                   row[candidates] * tile,
+                                                   self.wall_size, self.wall_size)]
+                hit[found] = True
+                hit_col[found] = col[found]
+                hit_row[found] = row[found]
+
+        if destructible is not None:
+            contested = np.flatnonzero(hit)
+            contested = contested[destructible[hit_row[contested], hit_col[contested]]]
+            tiles = hit_row[contested] * columns + hit_col[contested]
+            if len(np.unique(tiles)) < len(tiles):
+                self._resolve_destructible(contested, solid, destructible, hit, hit_col, hit_row)
+        return hit, hit_col[hit], hit_row[hit]
+
+    def _resolve_destructible(self, contested, solid, destructible, hit, hit_col, hit_row):
+        """
+        按下标顺序逐个重新判断第一个命中可摧毁墙壁的子弹：
+        墙壁已被前面的子弹摧毁时，子弹改为命中下一个候选格子，或者继续飞行
+        """
+        destroyed = set()
+        for i in contested.tolist():
+            found = None
+            for tile in self._candidate_tiles(i, solid.shape):
+                if solid[tile[1], tile[0]] and tile not in destroyed:
+                    found = tile
+                    break
+            if found is None:
+                hit[i] = False
+                continue
+            hit_col[i], hit_row[i] = found
+            if destructible[found[1], found[0]]:
+                destroyed.add(found)
+
+    def _candidate_tiles(self, i, shape):
+        """
+        第i颗子弹本帧移动路径上的墙壁所在的格子 (列, 行)，按先行后列的顺序
+        """
+        tile = self.tile_size
+        rows, columns = shape
+        col0, col1, row0, row1 = (int(value) for value in self._path_range(i))
+        tiles = []
+        for row in range(max(row0, 0), min(row1, rows - 1) + 1):
+            for col in range(max(col0, 0), min(col1, columns - 1) + 1):
+                if self._path_hits(i, col * tile, row * tile, self.wall_size, self.wall_size):
+                    tiles.append((col, row))
+        return tiles
+
+    def _target_hits(self, targets, free):
+        """
+        free中的子弹按下标顺序击中路径上的第一个目标，目标被击中的次数达到上限后不再被击中
+        返回 (命中掩码, 每个目标被击中的次数列表)
+        """
+        n = self.count
+        hit = np.zeros(n, dtype=bool)
+        counts = [0] * len(targets)
+        if not targets or not free.any():
+            return hit, counts
+        # 所有目标一起计算，得到 (目标, 子弹) 的二维掩码
+        rects = np.array([(rect.left, rect.top, rect.width, rect.height)
+                          for rect, _, _ in targets]).reshape(-1, 4, 1)
+        masks = free & self._path_hits(slice(0, n), rects[:, 0], rects[:, 1],
+                                       rects[:, 2], rects[:, 3])
+        for mask, (_, exclude_owner, _) in zip(masks, targets):
+            code = self.owner_codes.get(exclude_owner)
+            if code is not None:
+                mask &= self.owner[:n] != code
+        remaining = [limit for _, _, limit in targets]
+        # 碰到目标的子弹很少，逐个处理
+        for i in np.flatnonzero(masks.any(axis=0)).tolist():
+            for t, mask in enumerate(masks):
+                if mask[i] and remaining[t] > 0:
+                    remaining[t] -= 1
+                    counts[t] += 1
+                    hit[i] = True
+                    break
+        return hit, counts
+
+    def _remove(self, order):
+        """
+        按order中的顺序删除子弹（删除前的下标），与EntityPool.flush()相同，
+        每次删除都用当前最后一颗子弹填补空位
+        只在Python中推算每个空位最终由哪颗子弹填补，再对每个数组做一次批量复制
+        """
+        if not len(order):
+            return
+        where = {}  # 原下标 -> 当前位置（只记录移动过的子弹）
+        source = {}  # 当前位置 -> 所放子弹的原下标（只记录变化的位置）
+        last = self.count
+        for i in order.tolist():
+            position = where.get(i, i)
+            last -= 1
+            moved = source.get(last, last)
+            source[position] = moved
+            where[moved] = position
+        self.count = last
+        targets = [position for position in source if position < last]
+        if not targets:
+            return
+        sources = [source[position] for position in targets]
+        for array in (self.x, self.y, self.dx, self.dy, self.speed, self.lifetime, self.owner):
+            array[targets] = array[sources]
+
+    def states(self):
+        """
+        导出为与GameEngine.get_game_state()中"bullets"相同格式的列表
+        """
+        n = self.count
+        return [{
+            "x": int(x),
+            "y": int(y),
+            "direction": VECTOR_DIRECTIONS[(int(dx), int(dy))],
+            "owner_id": self.owners[owner]
+        } for x, y, dx, dy, owner in zip(self.x[:n], self.y[:n], self.dx[:n], self.dy[:n],
+                                          self.owner[:n])]
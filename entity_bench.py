@@ -0,0 +1,133 @@
+# 实体内存与属性访问测试模块，对比__slots__实体与普通（带__dict__）对象
+#
+# 普通对象按实体的__slots__属性逐个复制到实例字典中，两者持有完全相同的属性值，
+# 只比较对象本身的开销（Rect、图像等被引用的对象两边共享，不计入）。
+# 另外对比子弹频繁创建、销毁时，列表复制 + list.remove() 与EntityPool的耗时。
+import os
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import random
+import sys
+import time
+import timeit
+
+from entity_pool import EntityPool
+from game_engine import Bullet, Tank, Wall
+
+
+class DictEntity:
+    """
+    带__dict__的对照对象
+    """
+
+
+def slot_names(cls):
+    """
+    类及其所有父类声明的__slots__属性
+    """
+    names = []
+    for klass in reversed(cls.__mro__):
+        names.extend(getattr(klass, "__slots__", ()))
+    return names
+
+
+def to_dict_entity(entity):
+    plain = DictEntity()
+    for name in slot_names(type(entity)):
+        setattr(plain, name, getattr(entity, name))
+    return plain
+
+
+def object_size(obj):
+    """
+    对象本身占用的字节数（包括实例字典）
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def access_time(obj, number):
+    """
+    每帧更新中常见的属性读写，返回每次循环的纳秒数
+    """
+    def loop():
+        obj.active
+        obj.rect
+        obj.direction
+        obj.speed
+        obj.lifetime = obj.lifetime - 1
+    return timeit.timeit(loop, number=number) / number * 1e9
+
+
+def churn_time(count, ticks, use_pool):
+    """
+    保持count颗子弹，每帧随机使约1/60的子弹失效并补充同样数量的新子弹，返回每帧的毫秒数
+    """
+    rng = random.Random(1)
+    if use_pool:
+        bullets = EntityPool(Bullet)
+        for _ in range(count):
+            bullets.spawn(50, 50, "up", "player")
+    else:
+        bullets = [Bullet(50, 50, "up", "player") for _ in range(count)]
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for bullet in bullets:
+            if rng.random() < 1 / 60:
+                bullet.active = False
+        if use_pool:
+            for bullet in bullets:
+                if not bullet.active:
+                    bullets.release(bullet)
+            bullets.flush()
+            while len(bullets) < count:
+                bullets.spawn(50, 50, "up", "player")
+        else:
+            for bullet in bullets[:]:
+                if not bullet.active:
+                    bullets.remove(bullet)
+            while len(bullets) < count:
+                bullets.append(Bullet(50, 50, "up", "player"))
+    return (time.perf_counter() - start) / ticks * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="实体内存与属性访问测试")
+    parser.add_argument("--count", type=int, default=5000, help="参与统计的子弹数量")
+    parser.add_argument("--number", type=int, default=1000000, help="属性访问的循环次数")
+    parser.add_argument("--ticks", type=int, default=300, help="创建、销毁测试的帧数")
+    args = parser.parse_args()
+
+    samples = {
+        "Tank": Tank(50, 50, "player", "玩家"),
+        "Bullet": Bullet(50, 50, "up", "player"),
+        "Wall": Wall(50, 50, 1)
+    }
+    print("每个对象的字节数（__slots__ / __dict__）:")
+    for name, entity in samples.items():
+        print(f"  {name}: {object_size(entity)} / {object_size(to_dict_entity(entity))}")
+
+    bullets = [Bullet(50, 50, "up", "player") for _ in range(args.count)]
+    slotted = sum(object_size(bullet) for bullet in bullets)
+    plain = sum(object_size(to_dict_entity(bullet)) for bullet in bullets)
+    print(f"{args.count} 颗子弹: {slotted / 1024:.0f} KB / {plain / 1024:.0f} KB")
+
+    bullet = samples["Bullet"]
+    print("属性访问（纳秒/次循环，__slots__ / __dict__）: "
+          f"{access_time(bullet, args.number):.1f} / "
+          f"{access_time(to_dict_entity(bullet), args.number):.1f}")
+
+    print(f"{args.count} 颗子弹的创建、销毁（毫秒/帧，EntityPool / 列表）: "
+          f"{churn_time(args.count, args.ticks, True):.2f} / "
+          f"{churn_time(args.count, args.ticks, False):.2f}")
+
+
+if __name__ == "__main__":
+    main()
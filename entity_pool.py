@@ -0,0 +1,125 @@
+# 实体池模块，紧凑存储频繁创建和销毁的游戏对象（子弹、墙壁）
+#
+# 在对象列表上调用list.remove()要先线性查找再整体前移，遍历时删除还得先复制列表。
+# EntityPool把有效对象连续存放在items中，删除时用最后一个对象填补空位（O(1)，不保持顺序）；
+# 遍历items时需要删除的对象先用release()登记，由flush()在每帧结束时统一删除。
+# 删除的对象进入空闲列表，下次spawn()时调用对象的reset()复用，而不是重新分配。
+#
+# 每个对象占用一个槽位，句柄由槽位编号和槽位的代数组成，保存在对象的handle属性中；
+# 对象被删除后槽位代数加一，旧句柄随之失效，get()对失效的句柄返回None。
+
+# 句柄中槽位编号所占的位数
+SLOT_BITS = 20
+SLOT_MASK = (1 << SLOT_BITS) - 1
+
+
+class EntityPool:
+    """
+    带句柄的紧凑对象池
+    factory(*args)创建新对象，复用对象时调用obj.reset(*args)，参数与factory相同
+    """
+    def __init__(self, factory):
+        self.factory = factory
+        # 有效对象，连续存放；_item_slots[i]为items[i]占用的槽位
+        self.items = []
+        self._item_slots = []
+        # 槽位 -> items中的下标（空闲槽位为-1），以及槽位的代数
+        self._slots = []
+        self._generations = []
+        self._free_slots = []
+        # 可复用的对象和等待删除的句柄
+        self._free_items = []
+        self._pending = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def spawn(self, *args):
+        """
+        创建（或复用）一个对象并加入池中，返回该对象
+        """
+        if self._free_items:
+            obj = self._free_items.pop()
+            obj.reset(*args)
+        else:
+            obj = self.factory(*args)
+
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._slots)
+            self._slots.append(-1)
+            self._generations.append(0)
+        self._slots[slot] = len(self.items)
+        self._item_slots.append(slot)
+        self.items.append(obj)
+        obj.handle = (self._generations[slot] << SLOT_BITS) | slot
+        return obj
+
+    def get(self, handle):
+        """
+        按句柄查找对象，对象已被删除时返回None
+        """
+        slot = handle & SLOT_MASK
+        if slot < len(self._slots) and self._generations[slot] == handle >> SLOT_BITS:
+            index = self._slots[slot]
+            if index >= 0:
+                return self.items[index]
+        return None
+
+    def despawn(self, obj):
+        """
+        立即删除对象，用最后一个对象填补空位；遍历items时应改用release()
+        对象不在池中时返回False
+        """
+        handle = obj.handle
+        if handle is None or self.get(handle) is not obj:
+            return False
+        slot = handle & SLOT_MASK
+        index = self._slots[slot]
+        last = len(self.items) - 1
+        if index != last:
+            moved_slot = self._item_slots[last]
+            self.items[index] = self.items[last]
+            self._item_slots[index] = moved_slot
+            self._slots[moved_slot] = index
+        self.items.pop()
+        self._item_slots.pop()
+
+        self._slots[slot] = -1
+        self._generations[slot] += 1
+        self._free_slots.append(slot)
+        obj.handle = None
+        self._free_items.append(obj)
+        return True
+
+    def release(self, obj):
+        """
+        登记删除对象，在flush()时真正删除；同一对象可以重复登记
+        """
+        if obj.handle is not None:
+            self._pending.append(obj.handle)
+
+    def flush(self):
+        """
+        删除所有登记的对象，已经失效的句柄直接跳过
+        """
+        for handle in self._pending:
+            obj = self.get(handle)
+            if obj is not None:
+                self.despawn(obj)
+        self._pending.clear()
+
+    def clear(self):
+        """
+        删除所有对象，对象进入空闲列表等待复用
+        """
+        while self.items:
+            self.despawn(self.items[-1])
+        self._pending.clear()
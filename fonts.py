@@ -0,0 +1,45 @@
+# 字体模块，所有绘制路径共享的字体注册表和文字渲染缓存
+#
+# pygame.font.SysFont每次调用都要查找系统字体，不能放在每帧执行的绘制循环中。
+# 字体按文件路径创建（路径由调用者用pygame.font.match_font查找一次并缓存），
+# 同一 (字体文件, 大小) 只创建一次Font对象，文字通过共享的TextCache渲染。
+import pygame
+
+from text_cache import TextCache
+
+# (字体文件路径, 大小) -> pygame.font.Font
+_fonts = {}
+
+# 全局共享的文字渲染缓存
+TEXT_CACHE = TextCache()
+
+
+def get_font(path=None, size=24):
+    """
+    返回指定字体文件和大小的字体，path为None时使用pygame默认字体
+    直接打开字体文件，不扫描系统字体
+    """
+    key = (path, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[key] = pygame.font.Font(path, size)
+    return font
+
+
+def render_text(text, color, font=None, antialias=True):
+    """
+    通过共享缓存渲染文字，font为None时使用默认字体；返回的Surface不应被修改
+    """
+    if font is None:
+        font = get_font()
+    return TEXT_CACHE.render(font, text, antialias, color)
+
+
+def clear():
+    """
+    清空字体和文字缓存（pygame.quit()之后字体对象不再可用）
+    """
+    _fonts.clear()
+    TEXT_CACHE.clear()
@@ -0,0 +1,147 @@
+# 分帧模块，基于bytearray和memoryview的接收缓冲区，供两个网络管理器共用
+#
+# 数据通过recv_into（或asyncio.BufferedProtocol）直接写入缓冲区的空闲部分，
+# 完整的帧以memoryview切片的形式返回，不做字符串拼接也不复制。
+# 只有整帧到齐后才解码，因此跨越两次recv的UTF-8多字节字符（如中文用户名）不会被破坏。
+import struct
+
+LENGTH_PREFIX = struct.Struct("!I")
+
+DEFAULT_CAPACITY = 64 * 1024
+MIN_RECV_SIZE = 4096
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+class FrameBuffer:
+    """
+    接收缓冲区基类
+    data[start:end]为已接收但尚未解析的数据，data[end:]为可写入的空闲空间
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.data = bytearray(capacity)
+        self.view = memoryview(self.data)
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    def writable(self, min_size=MIN_RECV_SIZE):
+        """
+        返回至少min_size字节的可写memoryview，之前返回的帧切片随之失效
+        """
+        if self.start == self.end:
+            # 数据已全部解析，直接从头开始写
+            self.start = self.end = 0
+        if len(self.data) - self.end < min_size:
+            pending = self.end - self.start
+            if self.start and len(self.data) - pending >= min_size:
+                # 把未解析的数据移到缓冲区开头（memoryview赋值按memmove处理重叠）
+                self.view[:pending] = self.view[self.start:self.end]
+            else:
+                # 空间不足，分配更大的缓冲区
+                capacity = max(len(self.data) * 2, pending + min_size)
+                data = bytearray(capacity)
+                data[:pending] = self.view[self.start:self.end]
+                self.data = data
+                self.view = memoryview(self.data)
+            self.start = 0
+            self.end = pending
+        return self.view[self.end:]
+
+    def commit(self, nbytes):
+        """
+        确认有nbytes字节已写入writable()返回的空间
+        """
+        self.end += nbytes
+
+    def feed(self, data):
+        """
+        追加一段数据（用于只能拿到bytes的场景）
+        """
+        size = len(data)
+        self.writable(size)[:size] = data
+        self.commit(size)
+
+    def recv_into(self, sock, min_size=MIN_RECV_SIZE):
+        """
+        从阻塞socket直接接收到缓冲区，返回接收的字节数（0表示连接关闭）
+        """
+        nbytes = sock.recv_into(self.writable(min_size))
+        self.commit(nbytes)
+        return nbytes
+
+    def frames(self):
+        """
+        依次返回缓冲区中所有完整帧的memoryview，由子类实现
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        self.start = 0
+        self.end = 0
+
+
+class LineFramer(FrameBuffer):
+    """
+    换行符分隔的帧
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        super().__init__(capacity)
+        self.scan = 0  # 已确认不含换行符的位置，避免重复扫描半帧数据
+
+    def frames(self):
+        data = self.data
+        while True:
+            end = data.find(b"\n", max(self.start, self.scan), self.end)
+            if end < 0:
+                self.scan = self.end
+                return
+            frame = self.view[self.start:end]
+            self.start = end + 1
+            self.scan = self.start
+            yield frame
+
+    def writable(self, min_size=MIN_RECV_SIZE):
+        offset = self.scan - self.start
+        view = super().writable(min_size)
+        self.scan = self.start + offset
+        return view
+
+    def clear(self):
+        super().clear()
+        self.scan = 0
+
+
+class LengthPrefixFramer(FrameBuffer):
+    """
+    4字节大端长度前缀的帧
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_frame_size=MAX_FRAME_SIZE):
+        super().__init__(capacity)
+        self.max_frame_size = max_frame_size
+
+    def frames(self):
+        while self.end - self.start >= LENGTH_PREFIX.size:
+            (length,) = LENGTH_PREFIX.unpack_from(self.data, self.start)
+            if length > self.max_frame_size:
+                raise ValueError(f"帧长度超过上限: {length}")
+            begin = self.start + LENGTH_PREFIX.size
+            if begin + length > self.end:
+                return
+            self.start = begin + length
+            yield self.view[begin:begin + length]
+
+
+def encode_line(payload):
+    """
+    编码换行分隔的帧
+    """
+    return payload + b"\n"
+
+
+def encode_length_prefixed(payload):
+    """
+    编码长度前缀的帧
+    """
+    return LENGTH_PREFIX.pack(len(payload)) + payload
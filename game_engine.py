@@ -4,19 +4,96 @@ import pygame
 import random
 from constants import *
 
-# 导入设置和创建图像缓存
+# 导入设置
 from settings import Settings
+from interpolation import InterpolationBuffer, RemoteClock, INTERPOLATION_DELAY
+from game_logging import get_logger
+from entity_pool import EntityPool
+from bullet_pool import BulletPool, HAS_NUMPY, blocking_grid
+import assets
+import fonts
 
-IMAGE_CACHE = {}
+logger = get_logger("game_engine")
+
+# 草的半透明度，以及草覆盖层中表示透明的颜色
+WEED_ALPHA = 100
+WEED_LAYER_KEY = (255, 0, 255)
+
+# 坦克方向到移动方向的映射，支持字符串方向或Settings常量
+TANK_DIRECTIONS = {
+    Settings.LEFT: "left",
+    Settings.RIGHT: "right",
+    Settings.UP: "up",
+    Settings.DOWN: "down",
+    "left": "left",
+    "right": "right",
+    "up": "up",
+    "down": "down"
+}
+
+# 地图格子的材质标志：阻挡子弹、阻挡坦克、被子弹击中后摧毁
+BLOCKS_BULLETS = 0x01
+BLOCKS_TANKS = 0x02
+DESTRUCTIBLE = 0x04
+
+# 墙壁类型（即地图格子中的材质编号） -> 材质标志，按编号直接索引
+# 坦克可以穿过草；子弹仍会被草挡住（与原有的子弹碰撞一致），草不会被摧毁
+MATERIAL_FLAGS = bytearray(256)
+for _wall_type in (Settings.RED_WALL, Settings.IRON_WALL, Settings.BOSS_WALL):
+    MATERIAL_FLAGS[_wall_type] = BLOCKS_BULLETS | BLOCKS_TANKS
+MATERIAL_FLAGS[Settings.WEED_WALL] = BLOCKS_BULLETS
+MATERIAL_FLAGS[Settings.RED_WALL] |= DESTRUCTIBLE
+
+def disjoint_rects(rects):
+    """
+    把可能互相重叠的矩形拆分为覆盖同样区域、互不重叠的矩形列表
+    用于半透明的图层，重叠部分重复blit会叠加两次透明度
+    """
+    result = []
+    for rect in rects:
+        pieces = [rect]
+        for placed in result:
+            remaining = []
+            for piece in pieces:
+                if not piece.colliderect(placed):
+                    remaining.append(piece)
+                    continue
+                # 去掉重叠部分，剩下的区域最多分为上、下、左、右四块
+                overlap = piece.clip(placed)
+                for part in ((piece.left, piece.top, piece.width, overlap.top - piece.top),
+                             (piece.left, overlap.bottom, piece.width, piece.bottom - overlap.bottom),
+                             (piece.left, overlap.top, overlap.left - piece.left, overlap.height),
+                             (overlap.right, overlap.top, piece.right - overlap.right, overlap.height)):
+                    if part[2] > 0 and part[3] > 0:
+                        remaining.append(pygame.Rect(part))
+            pieces = remaining
+        result.extend(pieces)
+    return result
+
+def contact_interval(rect, dx, dy, target):
+    """
+    rect沿单位方向(dx, dy)移动距离m时，entry < m < exit 的范围内与target重叠（假定横向已重叠）
+    """
+    if dx > 0:
+        return target.left - rect.right, target.right - rect.left
+    if dx < 0:
+        return rect.left - target.right, rect.right - target.left
+    if dy > 0:
+        return target.top - rect.bottom, target.bottom - rect.top
+    return rect.top - target.bottom, rect.bottom - target.top
 
 class GameObject:
     """
     游戏对象基类
+    所有属性都在__slots__中预先声明，子类同样如此：实例不带__dict__，更省内存，属性访问也更快
     """
+    __slots__ = ("rect", "color", "active", "image_name", "image", "handle")
+    
     def __init__(self, x, y, width, height, color=WHITE, image_name=None):
         self.rect = pygame.Rect(x, y, width, height)
         self.color = color
         self.active = True
+        self.handle = None  # 对象在EntityPool中的句柄
         self.image_name = image_name
         self.image = None
         
@@ -36,19 +113,12 @@ class GameObject:
             elif os.path.exists(f'resources/{image_name}'):
                 image_name = f'resources/{image_name}'
         
-        if image_name not in IMAGE_CACHE:
-            try:
-                # 尝试加载图像
-                image = pygame.image.load(image_name)
-                # 缩放图像以匹配对象大小
-                image = pygame.transform.scale(image, (self.rect.width, self.rect.height))
-                IMAGE_CACHE[image_name] = image
-                print(f"成功加载图像: {image_name}")
-            except Exception as e:
-                print(f"无法加载图像 {image_name}: {e}")
-                return False
-        
-        self.image = IMAGE_CACHE[image_name]
+        try:
+            # 从资源模块获取已转换为显示格式、缩放到对象大小的图像
+            self.image = assets.get_image(image_name, self.rect.size)
+        except (pygame.error, FileNotFoundError) as e:
+            logger.warning("无法加载图像 %s: %s", image_name, e)
+            return False
         return True
     
     def draw(self, screen):
@@ -66,6 +136,12 @@ class GameObject:
                 # 备用：如果没有图像，使用矩形绘制
                 pygame.draw.rect(screen, self.color, self.rect)
     
+    def dirty_rect(self):
+        """
+        draw()会改变的屏幕区域，用于局部刷新
+        """
+        return self.rect.copy()
+    
     def update(self):
         """
         更新游戏对象状态
@@ -76,7 +152,10 @@ class Tank(GameObject):
     """
     坦克类
     """
-    def __init__(self, x, y, player_id, username, color=GREEN, is_local=False):
+    __slots__ = ("player_id", "username", "direction", "speed", "shoot_cooldown", "max_health",
+                 "health", "is_local", "is_ai", "is_moving", "image_dict", "direction_images")
+    
+    def __init__(self, x, y, player_id, username, color=GREEN, is_local=False, is_ai=False):
         # 初始不加载图像，等待direction设置后再加载
         super().__init__(x, y, 30, 30, color)
         self.player_id = player_id
@@ -87,21 +166,24 @@ class Tank(GameObject):
         self.max_health = 100
         self.health = self.max_health
         self.is_local = is_local  # 是否是本地玩家
+        self.is_ai = is_ai  # 是否由引擎内置AI控制（远程玩家由网络输入控制）
+        self.is_moving = False  # AI坦克是否沿当前方向持续移动
         
         # 根据是否是本地玩家选择图像路径字典
         if is_local:
             self.image_dict = Settings.HERO_IMAGES
-            print("本地玩家图像字典:", self.image_dict)
+            logger.debug("本地玩家图像字典: %s", self.image_dict)
         else:
             self.image_dict = Settings.ENEMY_IMAGES
-            print("敌方玩家图像字典:", self.image_dict)
+            logger.debug("敌方玩家图像字典: %s", self.image_dict)
         
-        # 加载初始方向的图像
+        # 构造时一次性解析四个方向的图像，转向时只切换引用
+        self.direction_images = self._load_direction_images()
         self.update_image()
     
-    def update_image(self):
+    def _load_direction_images(self):
         """
-        根据当前方向更新坦克图像，确保方向映射正确且图像加载成功
+        加载并缩放四个方向的坦克图像，返回 方向字符串 -> Surface 的字典
         """
         # 方向映射：将字符串方向映射到Settings中的常量
         direction_map = {
@@ -111,24 +193,36 @@ class Tank(GameObject):
             "right": Settings.RIGHT
         }
         
-        # 获取对应的方向常量
-        dir_constant = direction_map.get(self.direction, Settings.UP)
-        print(f"坦克方向: {self.direction}, 方向常量: {dir_constant}")
-        
-        # 检查方向常量是否在图像字典中
-        if dir_constant in self.image_dict:
+        images = {}
+        for direction, dir_constant in direction_map.items():
+            # 检查方向常量是否在图像字典中
+            if dir_constant not in self.image_dict:
+                logger.error("方向常量 %s 不在图像字典中", dir_constant)
+                continue
             image_path = self.image_dict[dir_constant]
-            print(f"加载图像: {image_path}")
-            success = self.load_image(image_path)
-            if not success:
-                print(f"警告: 无法加载图像 {image_path}")
-        else:
-            print(f"错误: 方向常量 {dir_constant} 不在图像字典中")
-            # 使用默认图像作为备选
-            if hasattr(Settings, 'HERO_IMAGE_NAME') and self.is_local:
-                self.load_image(Settings.HERO_IMAGE_NAME)
-            elif hasattr(Settings, 'ENEMY_IMAGES') and not self.is_local and Settings.UP in Settings.ENEMY_IMAGES:
-                self.load_image(Settings.ENEMY_IMAGES[Settings.UP])
+            if self.load_image(image_path):
+                images[direction] = self.image
+            else:
+                logger.warning("无法加载图像 %s", image_path)
+        
+        # 缺失的方向使用默认图像作为备选
+        if "up" not in images:
+            if self.is_local and self.load_image(Settings.HERO_IMAGE_NAME):
+                images["up"] = self.image
+            elif not self.is_local and Settings.UP in Settings.ENEMY_IMAGES \
+                    and self.load_image(Settings.ENEMY_IMAGES[Settings.UP]):
+                images["up"] = self.image
+        return images
+    
+    def update_image(self):
+        """
+        根据当前方向切换到预先加载的坦克图像，不访问文件系统
+        """
+        image = self.direction_images.get(self.direction)
+        if image is None:
+            image = self.direction_images.get("up")
+        if image is not None:
+            self.image = image
     
     def move(self, direction):
         """
@@ -136,7 +230,7 @@ class Tank(GameObject):
         """
         self.direction = direction
         
-        # 更新图像
+        # 切换到对应方向的预加载图像（只替换引用）
         self.update_image()
         
         if direction == "up":
@@ -152,9 +246,9 @@ class Tank(GameObject):
         self.rect.x = max(0, min(self.rect.x, SCREEN_WIDTH - self.rect.width))
         self.rect.y = max(0, min(self.rect.y, SCREEN_HEIGHT - self.rect.height))
     
-    def shoot(self):
+    def shoot(self, spawn=None):
         """
-        发射子弹
+        发射子弹，spawn(x, y, direction, owner_id)用于创建子弹（如从子弹池中复用），默认新建Bullet
         """
         if self.shoot_cooldown <= 0:
             # 计算子弹初始位置（从坦克中心发射）
@@ -171,7 +265,7 @@ class Tank(GameObject):
                 bullet_x = self.rect.right
                 bullet_y = self.rect.centery - 5
             
-            bullet = Bullet(bullet_x, bullet_y, self.direction, self.player_id)
+            bullet = (spawn or Bullet)(bullet_x, bullet_y, self.direction, self.player_id)
             self.shoot_cooldown = 20  # 冷却时间
             return bullet
         return None
@@ -183,22 +277,11 @@ class Tank(GameObject):
         if self.shoot_cooldown > 0:
             self.shoot_cooldown -= 1
 
-        # 如果坦克有 is_moving 属性，按照方向持续移动
-        if hasattr(self, 'is_moving') and self.is_moving:
-            # 支持字符串方向或Settings常量
-            dir_map = {
-                Settings.LEFT: "left",
-                Settings.RIGHT: "right",
-                Settings.UP: "up",
-                Settings.DOWN: "down",
-                "left": "left",
-                "right": "right",
-                "up": "up",
-                "down": "down"
-            }
-            cur_dir = self.direction
-            if cur_dir in dir_map:
-                self.move(dir_map[cur_dir])
+        # is_moving为True时按照方向持续移动
+        if self.is_moving:
+            direction = TANK_DIRECTIONS.get(self.direction)
+            if direction is not None:
+                self.move(direction)
     
     def draw(self, screen):
         """
@@ -225,23 +308,73 @@ class Tank(GameObject):
         pygame.draw.rect(screen, RED, (self.rect.x, self.rect.y - 10, health_bar_width, health_bar_height))
         # 当前血量
         pygame.draw.rect(screen, GREEN, (self.rect.x, self.rect.y - 10, health_bar_width * health_percentage, health_bar_height))
+    
+    def dirty_rect(self):
+        """
+        坦克的绘制区域，包括四周10像素的炮管和上方的血量条
+        """
+        return self.rect.inflate(20, 20)
+
+# 坦克碰撞的粗检测（sort-and-sweep）中坦克矩形外扩的像素数，至少容纳两次推开（每次最多2像素）
+TANK_SWEEP_MARGIN = 4
+# 坦克数量达到该值时才使用排序扫掠，数量少时逐对检查更快（见tank_bench.py）
+TANK_SWEEP_MIN_TANKS = 24
+
+# 子弹图像默认朝右，各方向需要逆时针旋转的角度
+BULLET_ANGLES = {"right": 0, "left": 180, "up": 90, "down": -90}
+
+# 子弹方向 -> 移动的单位向量
+BULLET_VECTORS = {"right": (1, 0), "left": (-1, 0), "up": (0, -1), "down": (0, 1)}
+
+# 子弹击中坦克造成的伤害
+BULLET_DAMAGE = 25
 
 class Bullet(GameObject):
     """
     子弹类
     """
+    __slots__ = ("direction", "owner_id", "speed", "lifetime", "prev_x", "prev_y")
+    
     def __init__(self, x, y, direction, owner_id):
         # 使用Settings中的子弹图像
         super().__init__(x, y, 10, 10, YELLOW, Settings.BULLET_IMAGE_NAME)
-        self.direction = direction
+        self.direction = None
+        self.reset(x, y, direction, owner_id)
+    
+    def reset(self, x, y, direction, owner_id):
+        """
+        （重新）初始化子弹状态，子弹池复用对象时调用，不重新分配矩形和图像
+        """
+        self.rect.x = x
+        self.rect.y = y
+        self.active = True
         self.owner_id = owner_id
         self.speed = 6
         self.lifetime = 60  # 子弹存在时间
+        # 最近一次update()前的位置，用于扫掠碰撞检测
+        self.prev_x = x
+        self.prev_y = y
+        self.set_direction(direction)
+    
+    def set_direction(self, direction):
+        """
+        设置方向并切换到对应方向的图像（四个方向的图像由所有子弹共享）
+        """
+        if direction == self.direction:
+            return
+        self.direction = direction
+        if self.image:
+            try:
+                self.image = assets.get_rotated(self.image_name, BULLET_ANGLES.get(direction, 0),
+                                                self.rect.size)
+            except (pygame.error, FileNotFoundError) as e:
+                logger.warning("无法加载图像 %s: %s", self.image_name, e)
     
     def update(self):
         """
         更新子弹位置
         """
+        self.prev_x, self.prev_y = self.rect.x, self.rect.y
         if self.direction == "up":
             self.rect.y -= self.speed
         elif self.direction == "down":
@@ -270,10 +403,12 @@ class Wall(GameObject):
     WEED_WALL (3): 草（半透明，可穿过）
     BOSS_WALL (5): 老家/boss墙（特殊处理）
     """
+    __slots__ = ("wall_type", "destructible")
+    
     def __init__(self, x, y, wall_type=1):
         # 确保使用Settings中定义的墙壁类型常量
         self.wall_type = wall_type
-        print(f"创建墙壁，类型: {wall_type}")
+        logger.debug("创建墙壁，类型: %s", wall_type)
         
         # 根据墙壁类型设置颜色和图像路径
         if wall_type == Settings.RED_WALL:  # 红墙
@@ -301,39 +436,85 @@ class Wall(GameObject):
             color = WHITE
             image_path = None
             self.destructible = False
-            print(f"警告: 未知的墙壁类型 {wall_type}")
+            logger.warning("未知的墙壁类型 %s", wall_type)
         
         # 初始化父类，传入图像路径
         super().__init__(x, y, 30, 30, color, image_path)
         
         # 如果图像加载失败，尝试备用路径
         if image_path and not self.image:
-            print(f"尝试备用图像路径: resources/images/walls/{wall_type}.png")
+            logger.debug("尝试备用图像路径: resources/images/walls/%s.png", wall_type)
             self.load_image(f"resources/images/walls/{wall_type}.png")
         
         # 对于草墙，设置半透明属性
         if wall_type == Settings.WEED_WALL and self.image:
-            self.image.set_alpha(100)  # 设置半透明效果
+            self.image.set_alpha(WEED_ALPHA)  # 设置半透明效果
+    
+    def reset(self, x, y, wall_type=1):
+        """
+        重新加载地图时复用已移除的墙壁对象，图像来自资源缓存
+        """
+        self.__init__(x, y, wall_type)
 
 class GameEngine:
     """
     游戏引擎类，管理游戏对象和游戏逻辑
     """
-    def __init__(self):
+    def __init__(self, numpy_bullets=None):
         self.tanks = []
-        self.bullets = []
-        self.walls = []
+        # 子弹和墙壁存放在对象池中，删除为O(1)，删除的对象留待复用
+        self.bullets = EntityPool(Bullet)
+        # numpy_bullets（默认取Settings.NUMPY_BULLETS）为True时子弹改由BulletPool批量模拟，
+        # 不再创建Bullet对象，self.bullets保持为空；游戏结果与逐个模拟Bullet对象相同
+        if numpy_bullets is None:
+            numpy_bullets = Settings.NUMPY_BULLETS
+        if numpy_bullets and not HAS_NUMPY:
+            logger.warning("未安装numpy，子弹改用Bullet对象模拟")
+            numpy_bullets = False
+        self.bullet_pool = BulletPool(tile_size=Settings.BOX_SIZE) if numpy_bullets else None
+        # BulletPool中的子弹没有对象，绘制时复用这些Bullet对象
+        self._bullet_sprites = []
+        self.walls = EntityPool(Wall)
+        # 地图格子：tiles按行保存每个格子的材质编号（0为空地），tile_walls保存对应的墙壁对象
+        self.tile_columns = 0
+        self.tile_rows = 0
+        self.tiles = bytearray()
+        self.tile_walls = []
+        # 已摧毁墙壁所在的格子 (列, 行)，用于网络同步
+        self.destroyed_walls = []
         self.local_player_id = None
         self.game_over = False
         self.winner_id = None
+        # 房主端已处理的各玩家最大输入序号，随快照发回客户端用于预测校正
+        self.input_acks = {}
+        # 已模拟的帧数，随快照发送作为房主的模拟时间
+        self.frame = 0
+        # 客户端远程坦克的插值缓冲区 player_id -> InterpolationBuffer
+        self.interpolation = {}
+        self.remote_clock = RemoteClock()
+        # 局部刷新：上一帧移动物体的绘制区域和本帧被摧毁的墙壁区域
+        self.drawn_rects = []
+        self.dirty_walls = []
+        self.full_redraw = True
+        # 静态地图图层：墙壁在load_map时一次性画到背景上，草画到坦克上方的覆盖层
+        self.wall_layer = None
+        self.weed_layer = None
+        self.weed_rects = []
     
     def init_game(self, players, local_player_id):
         """
         初始化游戏
         """
         self.tanks = []
-        self.bullets = []
-        self.walls = []
+        self.bullets.clear()
+        if self.bullet_pool is not None:
+            self.bullet_pool.clear()
+        self.walls.clear()
+        self.destroyed_walls = []
+        self.input_acks = {}
+        self.frame = 0
+        self.interpolation = {}
+        self.remote_clock.reset()
         self.local_player_id = local_player_id
         self.game_over = False
         self.winner_id = None
@@ -378,9 +559,9 @@ class GameEngine:
                 x, y = enemy_positions[i % len(enemy_positions)]
                 
                 # 创建敌人坦克
-                enemy_tank = Tank(x, y, enemy_id, enemy_name, color, is_local)
+                enemy_tank = Tank(x, y, enemy_id, enemy_name, color, is_local, is_ai=True)
                 self.tanks.append(enemy_tank)
-                print(f"生成敌人坦克 {enemy_name} 在位置 ({x}, {y})")
+                logger.debug("生成敌人坦克 %s 在位置 (%s, %s)", enemy_name, x, y)
         
         # 创建地图障碍
         self._create_map()
@@ -393,51 +574,58 @@ class GameEngine:
         # 调用load_map方法加载预设地图
         self.load_map(Settings.MAP_ONE)
     
-    def update(self):
+    def update(self, steps=1):
         """
-        更新游戏状态
+        更新游戏状态，steps为推进的帧数
+        服务器可以用较低的频率调用（如每次推进3帧即20Hz），每一帧仍依次完成坦克移动、
+        子弹移动和碰撞处理，结果与逐帧调用update()完全相同
         """
-        if self.game_over:
-            return
+        for _ in range(steps):
+            if self.game_over:
+                return
+            self._step()
+    
+    def _step(self):
+        """
+        推进一帧
+        """
+        self.frame += 1
         
         # 更新坦克
-        for tank in self.tanks[:]:
-            if hasattr(tank, 'is_alive') and not tank.is_alive:
-                self.tanks.remove(tank)
-                continue
-                
+        for tank in self.tanks:
             # 调用tank的update方法，这将处理基于is_moving属性的移动
-            # 简单AI: 如果不是本地玩家，则随机移动/转向
-            if not getattr(tank, 'is_local', False):
-                # 确保is_moving属性存在
-                if not hasattr(tank, 'is_moving'):
-                    tank.is_moving = False
+            # 简单AI: 只控制AI坦克，本地和远程玩家的坦克由输入驱动
+            if tank.is_ai and tank.player_id not in self.interpolation:
                 # 随机决定是否改变移动状态或方向
                 if random.random() < 0.02:  # ~2% 每帧改变一次行为
                     tank.is_moving = not tank.is_moving
                 if random.random() < 0.05:  # ~5% 改变方向
                     tank.direction = random.choice(["up", "down", "left", "right"])
+                # 看得见敌方坦克时转向它
+                aim = self.aim_direction(tank)
+                if aim is not None:
+                    tank.direction = aim
+            prev_x, prev_y = tank.rect.x, tank.rect.y
             tank.update()
-            
-            # 处理边界碰撞
-            if hasattr(tank, 'hit_wall'):
-                tank.hit_wall()
-                
-            # 对于Enemy类，处理撞墙转向
-            if hasattr(tank, 'hit_wall_turn'):
-                tank.hit_wall_turn()
-                
-        # 更新敌人坦克AI逻辑（如果有）
-        # 更新子弹
-        for bullet in self.bullets[:]:
-            if not bullet.active:
-                self.bullets.remove(bullet)
-                continue
-                
+            if self._tank_blocked(tank, prev_x, prev_y):
+                tank.rect.x, tank.rect.y = prev_x, prev_y
+                # AI坦克被墙挡住时换一个方向
+                if tank.is_ai:
+                    tank.direction = random.choice(["up", "down", "left", "right"])
+        
+        # 更新子弹，失效的子弹在本帧结束时统一删除；BulletPool中的子弹在碰撞检测时一并移动
+        for bullet in self.bullets:
             bullet.update()
+            if not bullet.active:
+                self.bullets.release(bullet)
+        
+        # 远程坦克移动到插值位置
+        if self.interpolation:
+            self._interpolate_remote_tanks()
         
         # 检测碰撞
         self._check_collisions()
+        self.bullets.flush()
         
         # 检查游戏是否结束
         active_tanks = [tank for tank in self.tanks if tank.active and tank.health > 0]
@@ -450,84 +638,376 @@ class GameEngine:
         """
         检测游戏对象之间的碰撞
         """
-        # 子弹与墙壁碰撞
-        for bullet in self.bullets[:]:
-            for wall in self.walls[:]:
-                if bullet.active and wall.active and bullet.rect.colliderect(wall.rect):
-                    bullet.active = False
-                    if wall.destructible:
-                        wall.active = False
-                        self.walls.remove(wall)
-                    break
+        if self.bullet_pool is not None:
+            self._step_bullet_pool()
         
-        # 子弹与坦克碰撞
-        for bullet in self.bullets[:]:
+        # 子弹与墙壁、坦克碰撞：沿子弹本帧移动的路径检测，击中最先碰到的物体
+        # 本帧到期或出界的子弹不做碰撞检测
+        for bullet in self.bullets:
             if not bullet.active:
                 continue
-                
-            for tank in self.tanks[:]:
-                if (bullet.active and tank.active and tank.health > 0 and 
-                    bullet.owner_id != tank.player_id and 
-                    bullet.rect.colliderect(tank.rect)):
-                    bullet.active = False
-                    tank.health -= 25  # 子弹造成25点伤害
-                    
-                    if tank.health <= 0:
-                        tank.health = 0
-                        tank.active = False
-                    break
-        
-        # 坦克与墙壁碰撞
-        for tank in self.tanks[:]:
-            if not tank.active:
-                continue
-                
-            # 保存当前位置
-            prev_x, prev_y = tank.rect.x, tank.rect.y
             
-            # 检查与所有墙壁的碰撞
-            collision = False
-            for wall in self.walls:
-                if wall.active and tank.rect.colliderect(wall.rect):
-                    collision = True
-                    break
-            
-            # 如果发生碰撞，恢复到之前的位置
-            if collision:
-                tank.rect.x, tank.rect.y = prev_x, prev_y
+            target = self._first_bullet_hit(bullet)
+            if target is None:
+                continue
+            bullet.active = False
+            self.bullets.release(bullet)
+            if isinstance(target, Wall):
+                if target.destructible:
+                    self._remove_wall(target)
+            else:
+                self._damage_tank(target, 1)
         
         # 坦克之间的碰撞
+        self._separate_tanks()
+    
+    def _step_bullet_pool(self):
+        """
+        BulletPool中的子弹推进一帧并处理击中的墙壁和坦克，结果与逐个处理Bullet对象相同
+        """
+        if not len(self.bullet_pool):
+            return
+        solid = destructible = None
+        if self.tile_columns:
+            solid = blocking_grid(self.tiles, self.tile_columns, MATERIAL_FLAGS, BLOCKS_BULLETS)
+            destructible = blocking_grid(self.tiles, self.tile_columns, MATERIAL_FLAGS, DESTRUCTIBLE)
+        # 每辆坦克最多被击中到摧毁为止，之后的子弹穿过它
+        targets = [(tank.rect, tank.player_id,
+                    -(-tank.health // BULLET_DAMAGE) if tank.active and tank.health > 0 else 0)
+                   for tank in self.tanks]
+        cols, rows, hits = self.bullet_pool.step(solid, destructible, targets)
+        for col, row in zip(cols.tolist(), rows.tolist()):
+            wall = self.wall_at(col, row)
+            if wall is not None and wall.destructible:
+                self._remove_wall(wall)
+        for tank, count in zip(self.tanks, hits):
+            if count:
+                self._damage_tank(tank, count)
+    
+    def _damage_tank(self, tank, hits):
+        """
+        坦克被hits颗子弹击中
+        """
+        tank.health -= BULLET_DAMAGE * hits
+        if tank.health <= 0:
+            tank.health = 0
+            tank.active = False
+    
+    def _separate_tanks(self):
+        """
+        把互相重叠的坦克推开，坦克较少时逐对检查更快
+        """
+        if len(self.tanks) < TANK_SWEEP_MIN_TANKS:
+            self._separate_tanks_pairwise()
+        else:
+            self._separate_tanks_sweep()
+    
+    def _separate_tanks_sweep(self):
+        """
+        把互相重叠的坦克推开，结果与_separate_tanks_pairwise()逐对检查完全相同
+        先按左边界排序扫掠（sort-and-sweep），找出外扩TANK_SWEEP_MARGIN后重叠的坦克对，
+        再按逐对检查的顺序处理这些候选对。坦克被推开的距离不超过外扩范围时，
+        候选对之外的坦克不可能重叠；挤成一团、推开距离超出范围时恢复位置并改用逐对检查
+        """
+        tanks = self.tanks
+        margin = TANK_SWEEP_MARGIN
+        reach = 2 * margin  # 两个矩形各外扩margin
+        order = sorted((tank.rect.left, i) for i, tank in enumerate(tanks) if tank.active)
+        
+        pairs = []
+        count = len(order)
+        for a in range(count):
+            i = order[a][1]
+            rect = tanks[i].rect
+            right = rect.right + reach
+            top = rect.top - reach
+            bottom = rect.bottom + reach
+            # 按左边界向后扫描，直到后面的坦克在x方向上不可能重叠
+            for b in range(a + 1, count):
+                left, j = order[b]
+                if left >= right:
+                    break
+                other = tanks[j].rect
+                if other.top < bottom and top < other.bottom:
+                    pairs.append((i, j) if i < j else (j, i))
+        if not pairs:
+            return
+        
+        pairs.sort()
+        start = [(tank.rect.x, tank.rect.y) for tank in tanks]
+        for i, j in pairs:
+            tank1, tank2 = tanks[i], tanks[j]
+            if not tank1.rect.colliderect(tank2.rect):
+                continue
+            self._push_apart(tank1, tank2)
+            for index, tank in ((i, tank1), (j, tank2)):
+                x, y = start[index]
+                if abs(tank.rect.x - x) > margin or abs(tank.rect.y - y) > margin:
+                    for other, (x0, y0) in zip(tanks, start):
+                        other.rect.x, other.rect.y = x0, y0
+                    self._separate_tanks_pairwise()
+                    return
+    
+    def _separate_tanks_pairwise(self):
+        """
+        逐对检查所有坦克，把重叠的坦克推开（O(n²)）
+        """
         for i, tank1 in enumerate(self.tanks):
             if not tank1.active:
                 continue
                 
             for tank2 in self.tanks[i+1:]:
                 if tank1.active and tank2.active and tank1.rect.colliderect(tank2.rect):
-                    # 简单处理：将两个坦克分开一点
-                    dx = tank1.rect.centerx - tank2.rect.centerx
-                    dy = tank1.rect.centery - tank2.rect.centery
-                    
-                    # 归一化方向向量
-                    distance = max(1, (dx**2 + dy**2)**0.5)
-                    dx /= distance
-                    dy /= distance
-                    
-                    # 移动坦克
-                    push_distance = 2
-                    tank1.rect.x += dx * push_distance
-                    tank1.rect.y += dy * push_distance
-                    tank2.rect.x -= dx * push_distance
-                    tank2.rect.y -= dy * push_distance
+                    self._push_apart(tank1, tank2)
+    
+    def _push_apart(self, tank1, tank2):
+        """
+        简单处理：沿两个坦克中心的连线将两个坦克分开一点
+        """
+        dx = tank1.rect.centerx - tank2.rect.centerx
+        dy = tank1.rect.centery - tank2.rect.centery
+        
+        # 归一化方向向量
+        distance = max(1, (dx**2 + dy**2)**0.5)
+        dx /= distance
+        dy /= distance
+        
+        # 移动坦克
+        push_distance = 2
+        tank1.rect.x += dx * push_distance
+        tank1.rect.y += dy * push_distance
+        tank2.rect.x -= dx * push_distance
+        tank2.rect.y -= dy * push_distance
+    
+    def _first_bullet_hit(self, bullet):
+        """
+        子弹本帧移动路径上碰到的墙壁或坦克，没有时返回None
+        子弹沿坐标轴移动，移动前后两个矩形的并集就是扫掠区域，速度再高也不会穿过物体。
+        同时碰到几个物体时墙壁优先、再按列表顺序
+        """
+        dx, dy = BULLET_VECTORS.get(bullet.direction, (0, 0))
+        start = pygame.Rect(bullet.prev_x, bullet.prev_y, bullet.rect.width, bullet.rect.height)
+        swept = start.union(start.move(dx * bullet.speed, dy * bullet.speed))
+        
+        candidates = [(wall, 0) for wall in self.walls_in_rect(swept, BLOCKS_BULLETS)]
+        candidates.extend((tank, 1) for tank in self.tanks
+                          if tank.active and tank.health > 0 and
+                          bullet.owner_id != tank.player_id and swept.colliderect(tank.rect))
+        
+        target = None
+        first = None
+        for obj, kind in candidates:
+            entry, exit = contact_interval(start, dx, dy, obj.rect)
+            if entry < 0 and exit <= bullet.speed:
+                # 移动前已与物体重叠（如在草中发射），移动后已离开的不算命中
+                continue
+            if first is None or kind < first:
+                target, first = obj, kind
+        return target
+    
+    def _remove_wall(self, wall):
+        """
+        移除被摧毁的墙壁，同时更新地图格子
+        """
+        wall.active = False
+        index = self.tile_index(wall.rect.x // Settings.BOX_SIZE, wall.rect.y // Settings.BOX_SIZE)
+        self.tiles[index] = 0
+        self.tile_walls[index] = None
+        self._erase_wall_from_layers(wall)
+        self.dirty_walls.append(wall.rect.copy())
+        self.destroyed_walls.append((wall.rect.x // Settings.BOX_SIZE, wall.rect.y // Settings.BOX_SIZE))
+        self.walls.despawn(wall)
+    
+    def tile_index(self, col, row):
+        """
+        格子在tiles中的下标，超出地图范围时返回-1
+        """
+        if 0 <= col < self.tile_columns and 0 <= row < self.tile_rows:
+            return row * self.tile_columns + col
+        return -1
+    
+    def is_solid(self, col, row):
+        """
+        格子中是否有墙壁（任意材质），直接读取材质格子，地图外视为空地
+        """
+        index = self.tile_index(col, row)
+        return index >= 0 and self.tiles[index] != 0
+    
+    def blocks_bullets(self, col, row):
+        index = self.tile_index(col, row)
+        return index >= 0 and bool(MATERIAL_FLAGS[self.tiles[index]] & BLOCKS_BULLETS)
+    
+    def blocks_tanks(self, col, row):
+        index = self.tile_index(col, row)
+        return index >= 0 and bool(MATERIAL_FLAGS[self.tiles[index]] & BLOCKS_TANKS)
+    
+    def wall_at(self, col, row):
+        """
+        返回格子中的墙壁，没有时返回None
+        """
+        index = self.tile_index(col, row)
+        return self.tile_walls[index] if index >= 0 else None
+    
+    def walls_in_rect(self, rect, flag):
+        """
+        依次返回与rect重叠、材质带有flag标志的墙壁
+        只检查rect覆盖的格子，空格子只需读取一个字节
+        """
+        size = Settings.BOX_SIZE
+        columns = self.tile_columns
+        tiles = self.tiles
+        col0 = max(rect.left // size, 0)
+        col1 = min((rect.right - 1) // size, columns - 1)
+        row0 = max(rect.top // size, 0)
+        row1 = min((rect.bottom - 1) // size, self.tile_rows - 1)
+        for row in range(row0, row1 + 1):
+            for index in range(row * columns + col0, row * columns + col1 + 1):
+                if MATERIAL_FLAGS[tiles[index]] & flag:
+                    wall = self.tile_walls[index]
+                    if rect.colliderect(wall.rect):
+                        yield wall
+    
+    def _tank_blocked(self, tank, prev_x, prev_y):
+        """
+        坦克移动后是否进入了移动前没有重叠的墙壁
+        出生点可能与墙壁重叠，已经重叠的墙壁不阻挡坦克离开
+        """
+        if tank.rect.x == prev_x and tank.rect.y == prev_y:
+            return False
+        prev_rect = pygame.Rect(prev_x, prev_y, tank.rect.width, tank.rect.height)
+        for wall in self.walls_in_rect(tank.rect, BLOCKS_TANKS):
+            if not prev_rect.colliderect(wall.rect):
+                return True
+        return False
+    
+    def has_line_of_sight(self, start, end):
+        """
+        两点（像素坐标）之间的连线是否没有经过阻挡子弹的格子，起点和终点所在的格子不计
+        按格子逐个遍历连线经过的格子（DDA），代价与距离成正比而与墙壁数量无关
+        """
+        size = Settings.BOX_SIZE
+        x0, y0 = start
+        x1, y1 = end
+        col, row = int(x0 // size), int(y0 // size)
+        end_col, end_row = int(x1 // size), int(y1 // size)
+        dx, dy = x1 - x0, y1 - y0
+        step_col = 1 if dx > 0 else -1
+        step_row = 1 if dy > 0 else -1
+        # 沿连线到达下一条竖直/水平格子边界所需的参数t，以及跨过一个格子的t增量
+        if dx:
+            next_x = (col + (step_col > 0)) * size
+            t_col = (next_x - x0) / dx
+            dt_col = size / abs(dx)
+        else:
+            t_col = dt_col = float("inf")
+        if dy:
+            next_y = (row + (step_row > 0)) * size
+            t_row = (next_y - y0) / dy
+            dt_row = size / abs(dy)
+        else:
+            t_row = dt_row = float("inf")
+        
+        # 每一步跨过一条格子边界，共经过 |列差| + |行差| - 1 个中间格子
+        for _ in range(abs(end_col - col) + abs(end_row - row) - 1):
+            if t_col < t_row:
+                col += step_col
+                t_col += dt_col
+            else:
+                row += step_row
+                t_row += dt_row
+            if self.blocks_bullets(col, row):
+                return False
+        return True
+    
+    def aim_direction(self, tank):
+        """
+        AI瞄准：与tank在同一行或同一列、中间没有阻挡子弹的墙壁的最近敌方坦克所在的方向，
+        没有时返回None；AI坦克与玩家坦克互为敌方，是否对齐按从坦克中心发射、宽10像素的子弹判断
+        """
+        cx, cy = tank.rect.center
+        aim = None
+        nearest = None
+        for other in self.tanks:
+            if other.is_ai == tank.is_ai or not other.active or other.health <= 0:
+                continue
+            rect = other.rect
+            if rect.left < cx + 5 and rect.right > cx - 5:
+                distance = rect.centery - cy
+                direction = "down" if distance > 0 else "up"
+                target = (cx, rect.centery)
+            elif rect.top < cy + 5 and rect.bottom > cy - 5:
+                distance = rect.centerx - cx
+                direction = "right" if distance > 0 else "left"
+                target = (rect.centerx, cy)
+            else:
+                continue
+            distance = abs(distance)
+            if (nearest is None or distance < nearest) and self.has_line_of_sight((cx, cy), target):
+                aim, nearest = direction, distance
+        return aim
+    
+    def _interpolate_remote_tanks(self):
+        """
+        把有插值缓冲区的远程坦克放到 房主当前时间 - INTERPOLATION_DELAY 时刻的位置
+        """
+        remote_now = self.remote_clock.now()
+        if remote_now is None:
+            return
+        render_time = remote_now - INTERPOLATION_DELAY
+        for tank in self.tanks:
+            buffer = self.interpolation.get(tank.player_id)
+            if buffer is None:
+                continue
+            state = buffer.sample(render_time)
+            if state is None:
+                continue
+            tank.rect.x, tank.rect.y, direction = state
+            if tank.direction != direction:
+                tank.direction = direction
+                tank.update_image()
+    
+    def get_tank(self, player_id):
+        """
+        按玩家ID查找坦克
+        """
+        for tank in self.tanks:
+            if tank.player_id == player_id:
+                return tank
+        return None
+    
+    def simulate_input(self, tank, direction):
+        """
+        模拟一帧的移动输入，房主的权威模拟和客户端的预测重放都使用这个方法
+        被墙挡住时只转向不移动
+        """
+        prev_x, prev_y = tank.rect.x, tank.rect.y
+        tank.move(direction)
+        if self._tank_blocked(tank, prev_x, prev_y):
+            tank.rect.x, tank.rect.y = prev_x, prev_y
+    
+    def apply_input(self, player_id, seq, direction):
+        """
+        房主按序号应用远程玩家的输入，重复或过期的输入会被忽略
+        """
+        if seq <= self.input_acks.get(player_id, 0):
+            return False
+        tank = self.get_tank(player_id)
+        if tank is None or not tank.active:
+            return False
+        self.simulate_input(tank, direction)
+        self.input_acks[player_id] = seq
+        return True
     
     def handle_shoot(self, player_id):
         """
-        处理射击事件
+        处理射击事件，返回新的子弹（使用BulletPool时为子弹在池中的下标）
         """
+        spawn = self.bullets.spawn if self.bullet_pool is None else self.bullet_pool.spawn
         for tank in self.tanks:
             if tank.player_id == player_id:
-                bullet = tank.shoot()
-                if bullet:
-                    self.bullets.append(bullet)
+                # 子弹直接从子弹池中创建（复用已删除的子弹对象）
+                bullet = tank.shoot(spawn)
+                if bullet is not None:
                     return bullet
         return None
     
@@ -535,33 +1015,109 @@ class GameEngine:
         """
         绘制游戏画面
         """
-        # 绘制背景
-        screen.fill(BLACK)
-        
-        # 绘制墙壁
-        for wall in self.walls:
-            wall.draw(screen)
+        # 绘制背景和墙壁（预先绘制的图层）
+        if self.wall_layer is not None:
+            screen.blit(self.wall_layer, (0, 0))
+        else:
+            screen.fill(BLACK)
         
-        # 绘制子弹
-        for bullet in self.bullets:
-            bullet.draw(screen)
+        # 绘制子弹和坦克
+        for obj in self._drawn_objects():
+            obj.draw(screen)
         
-        # 绘制坦克
-        for tank in self.tanks:
-            tank.draw(screen)
+        # 草覆盖在坦克和子弹上方
+        if self.weed_layer is not None:
+            for rect in self.weed_rects:
+                screen.blit(self.weed_layer, rect, rect)
         
         # 如果游戏结束，显示游戏结束信息
         if self.game_over:
-            font = pygame.font.SysFont(None, 64)
-            if self.winner_id:
-                winner_tank = next((t for t in self.tanks if t.player_id == self.winner_id), None)
-                winner_name = winner_tank.username if winner_tank else "未知"
-                text = font.render(f"游戏结束！胜利者: {winner_name}", True, WHITE)
+            self._draw_game_over(screen)
+    
+    def _drawn_objects(self):
+        """
+        按绘制顺序（子弹在下，坦克在上）返回需要绘制的对象，draw()和draw_dirty()共用
+        失效的子弹不绘制；被摧毁的坦克仍会绘制炮管和血量条
+        """
+        if self.bullet_pool is not None:
+            objects = self._pool_bullet_sprites()
+        else:
+            objects = [bullet for bullet in self.bullets if bullet.active]
+        objects.extend(self.tanks)
+        return objects
+    
+    def _pool_bullet_sprites(self):
+        """
+        把BulletPool中子弹的位置和方向设置到复用的Bullet对象上，用于绘制
+        """
+        states = self.bullet_pool.states()
+        sprites = self._bullet_sprites
+        for state in states[len(sprites):]:
+            sprites.append(Bullet(state["x"], state["y"], state["direction"], state["owner_id"]))
+        for sprite, state in zip(sprites, states):
+            sprite.reset(state["x"], state["y"], state["direction"], state["owner_id"])
+        return sprites[:len(states)]
+    
+    def _draw_game_over(self, screen):
+        """
+        绘制游戏结束信息，返回文字所在的区域
+        """
+        font = fonts.get_font(None, 64)
+        if self.winner_id:
+            winner_tank = next((t for t in self.tanks if t.player_id == self.winner_id), None)
+            winner_name = winner_tank.username if winner_tank else "未知"
+            text = fonts.render_text(f"游戏结束！胜利者: {winner_name}", WHITE, font)
+        else:
+            text = fonts.render_text("游戏结束！", WHITE, font)
+        
+        text_rect = text.get_rect(center=(Settings.SCREEN_RECT.width // 2, Settings.SCREEN_RECT.height // 2))
+        screen.blit(text, text_rect)
+        return text_rect
+    
+    def draw_dirty(self, screen):
+        """
+        只重绘发生变化的区域，返回需要传给pygame.display.update()的矩形列表
+        变化区域为上一帧和本帧坦克、子弹的位置以及本帧被摧毁的墙壁；
+        地图重新加载后的第一帧整屏绘制
+        """
+        objects = self._drawn_objects()
+        rects = [obj.dirty_rect() for obj in objects]
+        
+        if self.full_redraw:
+            self.full_redraw = False
+            self.dirty_walls = []
+            self.drawn_rects = rects
+            self.draw(screen)
+            return [screen.get_rect()]
+        
+        dirty = self.drawn_rects + rects + self.dirty_walls
+        self.drawn_rects = rects
+        self.dirty_walls = []
+        
+        # 按 墙壁图层 -> 子弹 -> 坦克 -> 草 的顺序重绘
+        for rect in dirty:
+            if self.wall_layer is not None:
+                screen.blit(self.wall_layer, rect, rect)
             else:
-                text = font.render("游戏结束！", True, WHITE)
-            
-            text_rect = text.get_rect(center=(Settings.SCREEN_RECT.width // 2, Settings.SCREEN_RECT.height // 2))
-            screen.blit(text, text_rect)
+                screen.fill(BLACK, rect)
+        # 每个对象本帧的绘制区域都在dirty中，背景已经重绘，因此每个对象只需绘制一次，
+        # 裁剪到它自己的区域内
+        for obj, rect in zip(objects, rects):
+            screen.set_clip(rect)
+            obj.draw(screen)
+        screen.set_clip(None)
+        # 草是半透明的，重叠的区域只能覆盖一次；只在草所在的格子上绘制
+        if self.weed_layer is not None:
+            weed_parts = []
+            for rect in dirty:
+                for index in rect.collidelistall(self.weed_rects):
+                    weed_parts.append(rect.clip(self.weed_rects[index]))
+            for rect in disjoint_rects(weed_parts):
+                screen.blit(self.weed_layer, rect, rect)
+        
+        if self.game_over:
+            dirty.append(self._draw_game_over(screen))
+        return dirty
     
     def get_game_state(self):
         """
@@ -573,14 +1129,17 @@ class GameEngine:
                 "x": tank.rect.x,
                 "y": tank.rect.y,
                 "health": tank.health,
-                "direction": tank.direction
+                "direction": tank.direction,
+                "input_seq": self.input_acks.get(tank.player_id, 0)
             } for tank in self.tanks],
-            "bullets": [{
+            "frame": self.frame,
+            "bullets": self.bullet_pool.states() if self.bullet_pool is not None else [{
                 "x": bullet.rect.x,
                 "y": bullet.rect.y,
                 "direction": bullet.direction,
                 "owner_id": bullet.owner_id
             } for bullet in self.bullets],
+            "destroyed_walls": list(self.destroyed_walls),
             "game_over": self.game_over,
             "winner_id": self.winner_id
         }
@@ -589,19 +1148,124 @@ class GameEngine:
         """
         加载地图数据
         """
-        self.walls = []
+        self.walls.clear()
+        self.tile_rows = len(map_data)
+        self.tile_columns = max((len(row) for row in map_data), default=0)
+        self.tiles = bytearray(self.tile_columns * self.tile_rows)
+        self.tile_walls = [None] * len(self.tiles)
+        self.full_redraw = True
         for y, row in enumerate(map_data):
             for x, cell in enumerate(row):
                 if cell == 1 or cell == 2 or cell == 3 or cell == 5:
                     # 根据cell值设置墙壁类型
                     wall_type = cell
                     # 创建墙壁，使用BOX_SIZE作为单元格大小
-                    wall = Wall(x * Settings.BOX_SIZE, y * Settings.BOX_SIZE, wall_type)
-                    self.walls.append(wall)
+                    wall = self.walls.spawn(x * Settings.BOX_SIZE, y * Settings.BOX_SIZE, wall_type)
+                    index = self.tile_index(x, y)
+                    self.tiles[index] = wall_type
+                    self.tile_walls[index] = wall
+        self._build_wall_layers()
+    
+    def _build_wall_layers(self):
+        """
+        把墙壁预先绘制到背景图层，把草绘制到覆盖层
+        每帧只需一次blit背景和一次blit覆盖层，而不是逐个绘制墙壁
+        """
+        self.wall_layer = pygame.Surface(Settings.SCREEN_RECT.size)
+        self.wall_layer.fill(BLACK)
+        weeds = []
+        for wall in self.walls:
+            if wall.wall_type == Settings.WEED_WALL:
+                weeds.append(wall)
+            else:
+                wall.draw(self.wall_layer)
+        
+        self.weed_layer = None
+        # 整屏半透明blit比逐块blit慢得多，覆盖层只在草所在的格子上绘制
+        self.weed_rects = [wall.rect.copy() for wall in weeds]
+        if weeds:
+            # 覆盖层用colorkey表示透明，整层统一设置草的半透明度
+            self.weed_layer = pygame.Surface(Settings.SCREEN_RECT.size)
+            self.weed_layer.fill(WEED_LAYER_KEY)
+            self.weed_layer.set_colorkey(WEED_LAYER_KEY)
+            for wall in weeds:
+                if wall.image:
+                    image = wall.image.copy()
+                    image.set_alpha(None)
+                    self.weed_layer.blit(image, wall.rect)
+                else:
+                    pygame.draw.rect(self.weed_layer, wall.color, wall.rect)
+            self.weed_layer.set_alpha(WEED_ALPHA)
+    
+    def _erase_wall_from_layers(self, wall):
+        """
+        墙壁被摧毁时只擦除图层中对应的区域
+        """
+        if wall.wall_type == Settings.WEED_WALL:
+            if self.weed_layer is not None:
+                self.weed_layer.fill(WEED_LAYER_KEY, wall.rect)
+        elif self.wall_layer is not None:
+            self.wall_layer.fill(BLACK, wall.rect)
     
     def set_game_state(self, game_state):
         """
         设置游戏状态（用于网络同步）
+        game_state与get_game_state()的格式相同，可来自JSON消息或snapshot_codec解码结果
         """
-        # 这里可以实现根据接收到的游戏状态更新本地游戏对象
-        pass
\ No newline at end of file
+        # 带有房主帧号的快照进入插值缓冲区，由update()平滑地移动远程坦克
+        frame = game_state.get("frame")
+        if frame is not None:
+            remote_time = frame / Settings.FPS
+            self.remote_clock.observe(remote_time)
+        
+        tanks_by_id = {tank.player_id: tank for tank in self.tanks}
+        for tank_state in game_state.get("tanks", []):
+            tank = tanks_by_id.get(tank_state["id"])
+            if tank is None:
+                continue
+            # 本地坦克由本地输入驱动，只同步血量
+            if tank.player_id != self.local_player_id:
+                if frame is not None:
+                    buffer = self.interpolation.get(tank.player_id)
+                    if buffer is None:
+                        buffer = self.interpolation[tank.player_id] = InterpolationBuffer()
+                    buffer.push(remote_time, tank_state["x"], tank_state["y"],
+                                tank_state["direction"])
+                else:
+                    tank.rect.x = tank_state["x"]
+                    tank.rect.y = tank_state["y"]
+                    if tank.direction != tank_state["direction"]:
+                        tank.direction = tank_state["direction"]
+                        tank.update_image()
+            tank.health = tank_state["health"]
+            tank.active = tank.health > 0
+        
+        # 子弹没有稳定标识，按顺序复用已有的子弹对象，多余的从末尾删除
+        # 复用的对象可能对应另一颗子弹，寿命和速度等状态必须像新子弹一样重新初始化
+        bullet_states = game_state.get("bullets", [])
+        if self.bullet_pool is not None:
+            self.bullet_pool.clear()
+            for bullet_state in bullet_states:
+                self.bullet_pool.spawn(bullet_state["x"], bullet_state["y"],
+                                       bullet_state["direction"], bullet_state["owner_id"])
+        else:
+            for i, bullet_state in enumerate(bullet_states):
+                if i < len(self.bullets):
+                    self.bullets[i].reset(bullet_state["x"], bullet_state["y"],
+                                          bullet_state["direction"], bullet_state["owner_id"])
+                else:
+                    self.bullets.spawn(bullet_state["x"], bullet_state["y"],
+                                       bullet_state["direction"], bullet_state["owner_id"])
+            while len(self.bullets) > len(bullet_states):
+                self.bullets.despawn(self.bullets[-1])
+        
+        # 移除对端已摧毁的墙壁
+        destroyed = {tuple(tile) for tile in game_state.get("destroyed_walls", [])}
+        destroyed.difference_update(self.destroyed_walls)
+        for col, row in destroyed:
+            wall = self.wall_at(col, row)
+            if wall is not None and wall.destructible:
+                self._remove_wall(wall)
+        
+        self.game_over = game_state.get("game_over", self.game_over)
+        self.winner_id = game_state.get("winner_id", self.winner_id)
@@ -0,0 +1,119 @@
+# 日志模块，对标准库logging的轻量封装，替代热路径中的print()
+# 支持日志级别、按模块开关，以及通过环境变量TANKWAR_LOG进行配置，例如：
+#   TANKWAR_LOG="WARNING,game_engine=DEBUG,network_manager=off"
+import logging
+import os
+import sys
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+ROOT_NAME = "tankwar"
+DEFAULT_LEVEL = INFO
+LOG_ENV = "TANKWAR_LOG"
+
+_root = logging.getLogger(ROOT_NAME)
+_configured = False
+
+
+class lazy:
+    """
+    延迟求值的日志参数，只有日志真正输出时才调用函数生成字符串
+    用法: logger.debug("状态: %s", lazy(lambda: expensive_dump()))
+    """
+    __slots__ = ("func",)
+
+    def __init__(self, func):
+        self.func = func
+
+    def __str__(self):
+        return str(self.func())
+
+
+def _parse_level(value):
+    """
+    解析级别名称，"off"表示关闭该模块
+    """
+    value = value.strip().upper()
+    if value in ("OFF", "NONE", "0"):
+        return None
+    level = logging.getLevelName(value)
+    if not isinstance(level, int):
+        raise ValueError(f"未知的日志级别: {value}")
+    return level
+
+
+def configure(spec=None, stream=None):
+    """
+    初始化日志输出，只需调用一次；spec缺省时读取环境变量TANKWAR_LOG
+    """
+    global _configured
+    if not _configured:
+        handler = logging.StreamHandler(stream or sys.stderr)
+        handler.setFormatter(logging.Formatter("[%(levelname)s] %(name)s: %(message)s"))
+        _root.addHandler(handler)
+        _root.propagate = False
+        _root.setLevel(DEFAULT_LEVEL)
+        _configured = True
+
+    if spec is None:
+        spec = os.environ.get(LOG_ENV, "")
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if "=" in item:
+            module, value = item.split("=", 1)
+            level = _parse_level(value)
+            if level is None:
+                disable(module.strip())
+            else:
+                set_level(level, module.strip())
+        else:
+            level = _parse_level(item)
+            if level is None:
+                # 子模块日志器不检查父日志器的disabled，只能通过级别关闭全部输出
+                _root.setLevel(logging.CRITICAL + 1)
+            else:
+                set_level(level)
+
+
+def configure_once():
+    """
+    尚未初始化时按环境变量初始化
+    """
+    if not _configured:
+        configure()
+
+
+def get_logger(module_name):
+    """
+    获取模块日志器，名称形如 tankwar.game_engine
+    """
+    configure_once()
+    return logging.getLogger(f"{ROOT_NAME}.{module_name}")
+
+
+def set_level(level, module=None):
+    """
+    设置全局或指定模块的日志级别
+    """
+    logger = _root if module is None else logging.getLogger(f"{ROOT_NAME}.{module}")
+    logger.setLevel(level)
+    logger.disabled = False
+
+
+def disable(module):
+    """
+    关闭指定模块的全部日志
+    """
+    logging.getLogger(f"{ROOT_NAME}.{module}").disabled = True
+
+
+def enable(module):
+    """
+    重新打开指定模块的日志
+    """
+    logging.getLogger(f"{ROOT_NAME}.{module}").disabled = False
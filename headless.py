@@ -0,0 +1,123 @@
+# 无界面模拟模块，以固定步长驱动GameEngine，用于AI调参和CI回归测试
+import os
+
+# 使用SDL虚拟驱动，不创建窗口也不需要显卡/声卡
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import random
+import time
+
+from game_engine import GameEngine
+from settings import Settings
+
+
+class HeadlessRunner:
+    """
+    无界面运行器
+    不调用display.flip()和clock.tick()，每个固定步长dt调用一次GameEngine.update()，
+    可连续模拟多局比赛并统计每秒模拟的帧数
+    dt大于一帧时（如20Hz服务器dt=0.05）每次update()推进多帧，引擎仍逐帧模拟，模拟的帧数不变，
+    只有射击决策按update()的频率进行
+    """
+    def __init__(self, players=None, dt=1.0 / Settings.FPS, max_ticks=Settings.FPS * 180,
+                 fire_rate=0.02, seed=None, numpy_bullets=None):
+        # 默认一名玩家，由引擎生成敌人坦克；所有坦克均由AI控制
+        self.players = players or {"player_1": {"username": "玩家1"}}
+        self.dt = dt
+        # 每次update()推进的游戏帧数
+        self.steps = max(1, round(dt * Settings.FPS))
+        self.max_ticks = max_ticks  # 每局最大游戏帧数
+        self.fire_rate = fire_rate  # 每帧每辆坦克尝试射击的概率
+        self.random = random.Random(seed)
+        self.engine = GameEngine(numpy_bullets=numpy_bullets)
+
+    def run_match(self):
+        """
+        模拟一局比赛，直到游戏结束或达到最大帧数
+        """
+        engine = self.engine
+        # 不指定本地玩家，所有坦克都交给引擎内置的AI控制
+        engine.init_game(self.players, None)
+        for tank in engine.tanks:
+            tank.is_ai = True
+
+        ticks = 0
+        updates = 0
+        sim_time = 0.0
+        # 一次推进多帧时，射击概率换算为这几帧中至少尝试一次的概率（射击冷却远大于一次推进的帧数）
+        fire_rate = 1 - (1 - self.fire_rate) ** self.steps
+        while not engine.game_over and ticks < self.max_ticks:
+            for tank in engine.tanks:
+                if tank.active and self.random.random() < fire_rate:
+                    engine.handle_shoot(tank.player_id)
+            engine.update(self.steps)
+            ticks += self.steps
+            updates += 1
+            sim_time += self.dt
+
+        return {
+            "ticks": ticks,
+            "updates": updates,
+            "sim_time": sim_time,
+            "game_over": engine.game_over,
+            "winner_id": engine.winner_id
+        }
+
+    def run(self, matches=1):
+        """
+        连续模拟多局比赛，返回汇总统计
+        """
+        results = []
+        start = time.perf_counter()
+        for _ in range(matches):
+            results.append(self.run_match())
+        elapsed = time.perf_counter() - start
+
+        total_ticks = sum(result["ticks"] for result in results)
+        total_updates = sum(result["updates"] for result in results)
+        return {
+            "matches": matches,
+            "ticks": total_ticks,
+            "updates": total_updates,
+            "elapsed": elapsed,
+            "ticks_per_second": total_ticks / elapsed if elapsed > 0 else 0.0,
+            "matches_per_minute": matches * 60.0 / elapsed if elapsed > 0 else 0.0,
+            "results": results
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="坦克大战无界面模拟")
+    parser.add_argument("--matches", type=int, default=10, help="模拟的比赛局数")
+    parser.add_argument("--max-ticks", type=int, default=Settings.FPS * 180, help="每局最大帧数")
+    parser.add_argument("--fire-rate", type=float, default=0.02, help="每帧每辆坦克的射击概率")
+    parser.add_argument("--tick-rate", type=int, default=Settings.FPS,
+                        help="每秒调用GameEngine.update()的次数，如20或30；每次推进多帧但仍逐帧模拟，"
+                             "只改变射击决策的频率，不减少模拟工作量")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子，便于复现")
+    parser.add_argument("--numpy-bullets", action="store_true", default=None,
+                        help="用NumPy子弹池模拟子弹（默认取Settings.NUMPY_BULLETS）")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        # 引擎内置AI使用全局random，同样需要固定种子
+        random.seed(args.seed)
+
+    runner = HeadlessRunner(dt=1.0 / args.tick_rate, max_ticks=args.max_ticks,
+                            fire_rate=args.fire_rate, seed=args.seed,
+                            numpy_bullets=args.numpy_bullets)
+    summary = runner.run(args.matches)
+
+    finished = sum(1 for result in summary["results"] if result["game_over"])
+    print(f"比赛局数: {summary['matches']}（已分胜负 {finished}）")
+    print(f"模拟帧数: {summary['ticks']}（update {summary['updates']} 次），"
+          f"耗时 {summary['elapsed']:.2f} 秒")
+    print(f"每秒帧数: {summary['ticks_per_second']:.0f} ticks/s")
+    print(f"每分钟局数: {summary['matches_per_minute']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# 快照插值模块，远程坦克在略早于当前的时间点上渲染，在收到的两个快照之间插值
+#
+# 房主以较低的频率（SNAPSHOT_RATE）发送快照，网络抖动会让快照成批到达。
+# 客户端按房主的模拟时间而不是到达时间保存快照，渲染时刻取
+# "估计的房主当前时间 - INTERPOLATION_DELAY"，这样通常总有前后两个快照可供插值；
+# 数据迟到时沿最后的速度短暂外推，超过MAX_EXTRAPOLATION后停在原地等待新数据。
+import time
+from collections import deque
+
+# 房主发送快照的频率（次/秒）
+SNAPSHOT_RATE = 20
+# 渲染延迟（秒），约为两个快照间隔，能容忍一个快照丢失
+INTERPOLATION_DELAY = 0.1
+# 数据迟到时最多外推的时长（秒）
+MAX_EXTRAPOLATION = 0.1
+# 估计时钟偏移时参考的最近快照数（约0.5秒），窗口越长越能过滤抖动，但跟随时钟漂移越慢
+CLOCK_WINDOW = SNAPSHOT_RATE // 2
+# 偏移变大时每个快照向最近最小偏移靠近的比例
+CLOCK_RELAX_RATE = 0.2
+
+
+class RemoteClock:
+    """
+    估计房主模拟时间与本地时钟的偏移（偏移 = 到达时间 - 房主时间）
+    网络延迟只会让偏移变大，因此以最近window个快照中的最小偏移（延迟最小的快照）为准，
+    偏移变小时立即采用；变大时按relax_rate逐步靠近，抖动不会让时钟来回跳动。
+    房主时间由帧号按Settings.FPS换算，房主实际帧率偏低或两端时钟频率不同时，
+    偏移会持续变化，最近窗口的最小值随之移动，估计值也跟着缓慢修正
+    """
+    def __init__(self, clock=time.perf_counter, window=CLOCK_WINDOW, relax_rate=CLOCK_RELAX_RATE):
+        self.clock = clock
+        self.relax_rate = relax_rate
+        self.recent = deque(maxlen=window)
+        self.offset = None
+
+    def observe(self, remote_time):
+        """
+        收到房主时间为remote_time的快照
+        """
+        offset = self.clock() - remote_time
+        self.recent.append(offset)
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+        else:
+            # 向最近窗口的最小偏移缓慢靠近，不超过它
+            floor = min(self.recent)
+            self.offset = min(self.offset + (floor - self.offset) * self.relax_rate, floor)
+
+    def now(self):
+        """
+        估计的房主当前时间，尚未收到快照时返回None
+        """
+        if self.offset is None:
+            return None
+        return self.clock() - self.offset
+
+    def reset(self):
+        self.recent.clear()
+        self.offset = None
+
+
+class InterpolationBuffer:
+    """
+    单个实体的插值缓冲区，保存按房主时间排序的 (时间, x, y, 方向) 样本
+    """
+    def __init__(self, max_extrapolation=MAX_EXTRAPOLATION, size=32):
+        self.max_extrapolation = max_extrapolation
+        self.samples = deque(maxlen=size)
+
+    def push(self, timestamp, x, y, direction):
+        """
+        添加一个样本，乱序或重复的样本被忽略
+        """
+        if self.samples and timestamp <= self.samples[-1][0]:
+            return
+        self.samples.append((timestamp, x, y, direction))
+
+    def sample(self, render_time):
+        """
+        返回render_time时刻的 (x, y, 方向)，没有样本时返回None
+        """
+        samples = self.samples
+        if not samples:
+            return None
+        first = samples[0]
+        if render_time <= first[0]:
+            return first[1], first[2], first[3]
+
+        last = samples[-1]
+        if render_time >= last[0]:
+            if len(samples) < 2:
+                return last[1], last[2], last[3]
+            # 数据迟到，沿最后两个样本的速度短暂外推
+            prev = samples[-2]
+            span = last[0] - prev[0]
+            ahead = min(render_time - last[0], self.max_extrapolation)
+            t = ahead / span
+            return (round(last[1] + (last[1] - prev[1]) * t),
+                    round(last[2] + (last[2] - prev[2]) * t),
+                    last[3])
+
+        # 丢弃早于render_time的旧样本，只保留插值区间的起点
+        while len(samples) > 2 and samples[1][0] <= render_time:
+            samples.popleft()
+        start, end = samples[0], samples[1]
+        t = (render_time - start[0]) / (end[0] - start[0])
+        return (round(start[1] + (end[1] - start[1]) * t),
+                round(start[2] + (end[2] - start[2]) * t),
+                start[3] if t < 0.5 else end[3])
+
+    def clear(self):
+        self.samples.clear()
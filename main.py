@@ -1,11 +1,17 @@
 # 坦克大战游戏主入口文件
 import pygame
 import sys
+import base64
 from constants import *
 from ui_manager import UIManager
-from network_manager import NetworkManager
 from game_state_manager import GameStateManager
 from game_engine import GameEngine
+from settings import Settings
+import assets
+from snapshot_codec import SnapshotEncoder, SnapshotDecoder
+from prediction import PredictionBuffer
+from udp_channel import PACKET_STATE
+from interpolation import SNAPSHOT_RATE
 
 class TankWar:
     def __init__(self):
@@ -14,6 +20,8 @@ class TankWar:
         # 设置游戏窗口
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("坦克大战")
+        # 设置显示模式后一次性加载所有图像并转换为显示格式
+        assets.preload(atlas=Settings.TEXTURE_ATLAS)
         # 设置时钟
         self.clock = pygame.time.Clock()
         
@@ -22,6 +30,15 @@ class TankWar:
         self.network_manager = None
         self.game_state_manager = GameStateManager()
         self.game_engine = GameEngine()
+        # 二进制增量快照编解码器（房主为每个客户端连接单独编码，客户端解码）
+        # 各客户端丢包、确认的进度不同，编码基准和确认状态都按连接分开保存
+        self.snapshot_encoders = {}  # 连接编号 -> SnapshotEncoder
+        self.snapshot_decoder = SnapshotDecoder()
+        # 距离下一次发送快照的帧数，快照以SNAPSHOT_RATE发送，客户端插值补足中间帧
+        self.snapshot_interval = max(1, Settings.FPS // SNAPSHOT_RATE)
+        self.snapshot_countdown = 0
+        # 客户端本地坦克的输入预测
+        self.prediction = PredictionBuffer()
         
         # 菜单按钮
         self.menu_buttons = []
@@ -187,7 +204,8 @@ class TankWar:
         # 设置为房主
         self.game_state_manager.is_host = True
         
-        # 初始化网络管理器
+        # 初始化网络管理器（asyncio等网络模块只在联机时才导入）
+        from network_manager import NetworkManager
         self.network_manager = NetworkManager(self.game_state_manager.username)
         
         # 启动服务器
@@ -217,6 +235,7 @@ class TankWar:
         
         try:
             peer_ip = input("请输入房间IP地址: ")
+            from network_manager import NetworkManager
             self.network_manager = NetworkManager(self.game_state_manager.username)
             
             # 尝试连接
@@ -331,6 +350,7 @@ class TankWar:
                 self.network_manager.send_message({"type": "game_starting"})
             # 初始化游戏引擎
             self.game_engine.init_game(self.game_state_manager.players, self.network_manager.username)
+            self.__reset_snapshots()
             # 切换到游戏运行状态
             self.game_state_manager.set_game_state(GAME_RUNNING)
         else:
@@ -497,6 +517,7 @@ class TankWar:
                 print("收到开始游戏指令")
                 # 初始化游戏
                 self.game_engine.init_game(self.game_state_manager.players, self.network_manager.username)
+                self.__reset_snapshots()
                 # 切换到游戏运行状态
                 self.game_state_manager.set_game_state(GAME_RUNNING)
             
@@ -505,6 +526,7 @@ class TankWar:
                 print("游戏开始！")
                 # 初始化游戏
                 self.game_engine.init_game(self.game_state_manager.players, self.network_manager.username)
+                self.__reset_snapshots()
                 # 切换到游戏运行状态
                 self.game_state_manager.set_game_state(GAME_RUNNING)
             
@@ -512,6 +534,99 @@ class TankWar:
                 # 收到游戏状态同步消息
                 game_state = message.get("game_state", {})
                 self.game_engine.set_game_state(game_state)
+            
+            elif message_type == "snapshot":
+                # 收到二进制增量快照（客户端）
+                # UDP通道直接携带字节，TCP通道携带base64字符串
+                try:
+                    data = message.get("payload")
+                    if data is None:
+                        data = base64.b64decode(message.get("data", ""))
+                    seq, game_state = self.snapshot_decoder.decode(data)
+                except ValueError as e:
+                    print(f"无法解码快照: {e}")
+                    continue
+                if game_state is not None:
+                    self.game_engine.set_game_state(game_state)
+                    self.__reconcile_local_tank(game_state)
+                    self.__send_unreliable({"type": "snapshot_ack", "seq": seq})
+            
+            elif message_type == "snapshot_ack":
+                # 客户端确认收到快照，该客户端的后续快照以它为基准（房主）
+                encoder = self.snapshot_encoders.get(message.get("peer"))
+                if encoder is not None:
+                    encoder.acknowledge(message.get("seq", 0))
+            
+            elif message_type == "player_input":
+                # 客户端的移动输入，按序号在房主的引擎上权威模拟（房主）
+                if self.game_state_manager.is_host:
+                    sender_id = message.get("sender_id")
+                    for seq, direction in message.get("inputs", []):
+                        self.game_engine.apply_input(sender_id, seq, direction)
+    
+    def __send_snapshot(self):
+        """
+        房主把当前游戏状态编码为增量快照，按SNAPSHOT_RATE发送给客户端
+        """
+        if not self.game_state_manager.is_host:
+            return
+        if not self.network_manager or not self.network_manager.connected:
+            return
+        self.snapshot_countdown -= 1
+        if self.snapshot_countdown > 0:
+            return
+        self.snapshot_countdown = self.snapshot_interval
+        game_state = self.game_engine.get_game_state()
+        peers = self.network_manager.peers()
+        # 丢弃已断开的客户端的编码器
+        for peer in list(self.snapshot_encoders):
+            if peer not in peers:
+                del self.snapshot_encoders[peer]
+        for peer in peers:
+            encoder = self.snapshot_encoders.get(peer)
+            if encoder is None:
+                encoder = self.snapshot_encoders[peer] = SnapshotEncoder()
+            data = encoder.encode(game_state)
+            # 优先走UDP状态通道，该客户端的UDP地址未知（或UDP不可用）时退回TCP
+            if not self.network_manager.send_unreliable(data, PACKET_STATE, peer):
+                self.network_manager.send_message_to(peer, {
+                    "type": "snapshot",
+                    "data": base64.b64encode(data).decode("ascii")
+                })
+    
+    def __is_network_client(self):
+        """
+        是否以客户端身份进行联机游戏
+        """
+        return (self.network_manager is not None and self.network_manager.connected
+                and not self.game_state_manager.is_host)
+    
+    def __reconcile_local_tank(self, game_state):
+        """
+        以快照中的权威位置校正本地坦克，并重放房主尚未处理的输入（客户端）
+        """
+        local_id = self.game_engine.local_player_id
+        for tank_data in game_state.get("tanks", []):
+            if tank_data["id"] == local_id:
+                self.prediction.reconcile(self.game_engine, local_id, tank_data["x"],
+                                          tank_data["y"], tank_data.get("input_seq", 0))
+                break
+    
+    def __send_unreliable(self, message):
+        """
+        通过UDP发送每帧都会被新消息取代的消息，UDP不可用时退回TCP
+        """
+        if not self.network_manager.send_unreliable(message):
+            self.network_manager.send_message(message)
+    
+    def __reset_snapshots(self):
+        """
+        新的一局开始时重置快照序号、基准和预测缓冲区
+        """
+        self.snapshot_encoders = {}
+        self.snapshot_decoder = SnapshotDecoder()
+        self.snapshot_countdown = 0
+        self.prediction.reset()
     
     def __disconnect_network(self):
         """
@@ -552,7 +667,10 @@ class TankWar:
             
             # 处理游戏运行状态下的按键事件
             elif self.game_state_manager.game_state == GAME_RUNNING:
-                if event.type == pygame.KEYDOWN:
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    # 窗口被遮挡后恢复，局部刷新无法还原被覆盖的内容
+                    self.game_engine.full_redraw = True
+                elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
                         # 射击
                         if self.network_manager and self.network_manager.connected:
@@ -569,9 +687,10 @@ class TankWar:
                         self.game_state_manager.set_game_state(MENU)
                         self.__update_main_menu_buttons()
     
-    def run_game(self):
+    def run_game(self, exit_after_first_frame=False):
         """
         游戏主循环
+        exit_after_first_frame为True时显示第一帧后立即退出，只供startup_bench.py测量启动耗时
         """
         while True:
             # 处理事件
@@ -579,6 +698,8 @@ class TankWar:
             
             # 获取当前鼠标位置（用于按钮悬停效果）
             mouse_pos = pygame.mouse.get_pos()
+            # 游戏画面局部刷新的区域，None表示整屏刷新
+            dirty_rects = None
             
             # 根据游戏状态执行不同的逻辑
             if self.game_state_manager.game_state == MENU:
@@ -640,35 +761,39 @@ class TankWar:
                             break
 
                 if local_tank:
-                    moved = False
+                    direction = None
                     if keys[pygame.K_LEFT]:
-                        local_tank.move("left")
-                        moved = True
+                        direction = "left"
                     elif keys[pygame.K_RIGHT]:
-                        local_tank.move("right")
-                        moved = True
+                        direction = "right"
                     elif keys[pygame.K_UP]:
-                        local_tank.move("up")
-                        moved = True
+                        direction = "up"
                     elif keys[pygame.K_DOWN]:
-                        local_tank.move("down")
-                        moved = True
+                        direction = "down"
 
-                    # 如果移动且联机，则发送位置同步（避免过多发送，可按帧发送）
-                    if moved and self.network_manager and getattr(self.network_manager, 'connected', False):
-                        self.network_manager.send_message({
-                            "type": "player_position",
-                            "sender_id": self.network_manager.username,
-                            "x": local_tank.rect.x,
-                            "y": local_tank.rect.y,
-                            "direction": local_tank.direction
-                        })
+                    if direction is not None:
+                        # 本地立即模拟，不等待房主的确认
+                        self.game_engine.simulate_input(local_tank, direction)
+                        # 客户端把输入发给房主权威模拟，每个包都携带所有未确认的输入以抵消丢包
+                        if self.__is_network_client():
+                            self.prediction.record(direction)
+                            self.__send_unreliable({
+                                "type": "player_input",
+                                "sender_id": self.network_manager.username,
+                                "inputs": self.prediction.unacknowledged()
+                            })
 
                 # 更新游戏状态
                 self.game_engine.update()
                 
+                # 房主同步游戏状态快照
+                self.__send_snapshot()
+                
                 # 绘制游戏画面
-                self.game_engine.draw(self.screen)
+                if Settings.DIRTY_RECTS:
+                    dirty_rects = self.game_engine.draw_dirty(self.screen)
+                else:
+                    self.game_engine.draw(self.screen)
                 
                 # 处理网络消息
                 self.__handle_network_messages()
@@ -678,8 +803,20 @@ class TankWar:
                 # 这里可以添加游戏结束画面的绘制
                 pass
             
-            # 更新显示
-            pygame.display.flip()
+            # 本帧产生的网络消息合并为一次写入
+            if self.network_manager:
+                self.network_manager.flush()
+            
+            # 更新显示（游戏画面只刷新变化的区域）
+            if dirty_rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
+            
+            if exit_after_first_frame:
+                self.__disconnect_network()
+                pygame.quit()
+                return
             
             # 控制帧率
             self.clock.tick(60)
@@ -1,110 +1,130 @@
 import socket
-import threading
+import queue
 import json
-import time
 import uuid
 import random
-import struct
+
+from async_transport import (AsyncTransport, LENGTH_FRAMING, EVENT_ACCEPTED,
+                             EVENT_MESSAGE, EVENT_CLOSED)
+from framing import LengthPrefixFramer, encode_length_prefixed
+from game_logging import get_logger
+
+logger = get_logger("network_legacy")
 
 class NetworkManager:
     def __init__(self, username="玩家"):
         self.username = username
         self.peer_id = str(uuid.uuid4())[:8]  # 生成唯一的客户端ID
         self.port = random.randint(50000, 60000)  # 随机端口
-        self.server_socket = None
-        self.connections = {}
-        self.listen_thread = None
+        self.connections = {}  # peer_id -> 连接信息，只在网络线程中修改
         self.running = False
         self.message_handler = None
+        self.message_queue = queue.Queue()  # 交给应用层的消息
         self.room_info = None  # 当前房间信息
         self.is_host = False
         self.player_status = {"ready": False}
-        
+        # 所有连接共用一个事件循环线程，消息使用4字节长度前缀分帧
+        self.transport = AsyncTransport(LENGTH_FRAMING, handler=self._handle_event)
+        self._conn_peers = {}  # 连接编号 -> peer_id
+        self._handshaking = {}  # 连接编号 -> 地址，等待初始信息的连接（房主端）
+        self._pending = {}  # 连接编号 -> 等待房间信息响应的队列（客户端）
+        self._host_address = None
+        self._recv_framers = {}  # socket -> receive_message()使用的分帧缓冲区
+
     def set_message_handler(self, handler):
-        """设置消息处理函数"""
+        """设置消息处理函数
+        与旧版一致，设置后消息在网络线程中直接交给处理函数；未设置时消息进入队列，
+        由get_messages()/dispatch_messages()取出"""
         self.message_handler = handler
-    
+
     def start_server(self):
         """启动服务器监听连接"""
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind(('0.0.0.0', self.port))
-            self.server_socket.listen(5)
+            self.transport.listen('0.0.0.0', self.port, backlog=5)
             self.running = True
-            self.listen_thread = threading.Thread(target=self.listen_connections)
-            self.listen_thread.daemon = True
-            self.listen_thread.start()
             return True, self.get_local_ip()
         except Exception as e:
+            self.transport.stop()
             return False, str(e)
-    
-    def listen_connections(self):
-        """监听新连接的线程函数"""
-        while self.running:
-            try:
-                client_socket, addr = self.server_socket.accept()
-                # 接收客户端的初始信息
-                client_info = self.receive_message(client_socket)
-                if client_info:
-                    client_id = client_info.get('peer_id')
-                    username = client_info.get('username')
-                    # 向新连接的客户端发送房间信息
-                    room_info_msg = {
-                        "type": "room_info",
-                        "room": self.room_info,
-                        "host": self.peer_id,
-                        "players": {}
-                    }
-                    
-                    # 如果是房主，发送所有玩家信息
-                    if self.is_host:
-                        for pid, conn_info in self.connections.items():
-                            room_info_msg["players"][pid] = {
-                                "username": conn_info["username"],
-                                "ready": conn_info.get("ready", False)
-                            }
-                    
-                    self.send_message(client_socket, room_info_msg)
-                    
-                    # 存储连接信息
-                    self.connections[client_id] = {
-                        "socket": client_socket,
-                        "address": addr,
-                        "username": username,
-                        "ready": False
-                    }
-                    
-                    # 启动接收消息的线程
-                    threading.Thread(target=self.handle_client_messages, 
-                                    args=(client_socket, client_id), daemon=True).start()
-                    
-                    # 如果是房主，通知其他玩家有新玩家加入
-                    if self.is_host:
-                        self.broadcast_message({
-                            "type": "player_joined",
-                            "peer_id": client_id,
-                            "username": username
-                        }, exclude=[client_id])
-                    
-                    # 通知应用层有新玩家加入
-                    if self.message_handler:
-                        self.message_handler({
-                            "type": "player_joined",
-                            "peer_id": client_id,
-                            "username": username
-                        })
-            except Exception as e:
-                if self.running:  # 避免在关闭时报告错误
-                    print(f"监听连接错误: {e}")
-                break
-    
-    def connect_to_host(self, host_ip, host_port, room_password=""):
+
+    def _handle_event(self, event, conn_id, payload):
+        """处理网络事件（在网络线程中调用）"""
+        if event == EVENT_ACCEPTED:
+            # 新连接的第一条消息是客户端的初始信息
+            self._handshaking[conn_id] = payload
+        elif event == EVENT_MESSAGE:
+            if conn_id in self._handshaking:
+                address = self._handshaking.pop(conn_id)
+                self._handle_handshake(conn_id, address, payload)
+            elif conn_id in self._pending:
+                self._handle_connect_response(conn_id, payload)
+            elif conn_id in self._conn_peers:
+                self._handle_client_message(self._conn_peers[conn_id], payload)
+        elif event == EVENT_CLOSED:
+            self._handshaking.pop(conn_id, None)
+            pending = self._pending.pop(conn_id, None)
+            if pending is not None:
+                pending.put(None)
+            client_id = self._conn_peers.pop(conn_id, None)
+            if client_id is not None:
+                self.handle_disconnect(client_id)
+        return True
+
+    def _handle_handshake(self, conn_id, address, client_info):
+        """处理新连接客户端的初始信息（房主端）"""
+        client_id = client_info.get('peer_id')
+        username = client_info.get('username')
+        # 向新连接的客户端发送房间信息
+        room_info_msg = {
+            "type": "room_info",
+            "room": self.room_info,
+            "host": self.peer_id,
+            "players": {}
+        }
+
+        # 如果是房主，发送所有玩家信息
+        if self.is_host:
+            for pid, conn_info in self.connections.items():
+                room_info_msg["players"][pid] = {
+                    "username": conn_info["username"],
+                    "ready": conn_info.get("ready", False)
+                }
+
+        self.transport.send_now(conn_id, room_info_msg)
+
+        # 存储连接信息
+        self.connections[client_id] = {
+            "conn_id": conn_id,
+            "address": address,
+            "username": username,
+            "ready": False
+        }
+        self._conn_peers[conn_id] = client_id
+
+        # 如果是房主，通知其他玩家有新玩家加入
+        if self.is_host:
+            self._broadcast({
+                "type": "player_joined",
+                "peer_id": client_id,
+                "username": username
+            }, exclude=[client_id])
+
+        # 通知应用层有新玩家加入
+        self._deliver({
+            "type": "player_joined",
+            "peer_id": client_id,
+            "username": username
+        })
+
+    def connect_to_host(self, host_ip, host_port, room_password="", timeout=5.0):
         """连接到主机"""
         try:
-            client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            client_socket.connect((host_ip, host_port))
-            
+            self.running = True
+            self._host_address = (host_ip, host_port)
+            conn_id = self.transport.connect(host_ip, host_port, timeout)
+            pending = queue.Queue()
+            self.transport.call_soon(self._pending.__setitem__, conn_id, pending)
+
             # 发送连接请求
             connect_request = {
                 "type": "connect_request",
@@ -113,53 +133,56 @@ class NetworkManager:
                 "password": room_password,
                 "port": self.port
             }
-            self.send_message(client_socket, connect_request)
-            
+            self.transport.send(conn_id, connect_request)
+
             # 等待房间信息响应
-            response = self.receive_message(client_socket)
+            try:
+                response = pending.get(timeout=timeout)
+            except queue.Empty:
+                response = None
             if not response:
-                client_socket.close()
+                self.transport.close(conn_id)
                 return False, "连接被拒绝"
-            
+
             if response.get("type") == "error":
-                client_socket.close()
+                self.transport.close(conn_id)
                 return False, response.get("message", "未知错误")
-            
+
             if response.get("type") == "room_info":
                 # 连接成功，保存房间信息
                 self.room_info = response.get("room")
                 self.is_host = False
-                
-                # 启动接收消息的线程
-                host_id = response.get("host")
-                self.connections[host_id] = {
-                    "socket": client_socket,
-                    "address": (host_ip, host_port),
-                    "username": "房主",
-                    "ready": False
-                }
-                
-                threading.Thread(target=self.handle_client_messages, 
-                                args=(client_socket, host_id), daemon=True).start()
-                
-                # 通知应用层连接成功，并发送房间信息
-                if self.message_handler:
-                    self.message_handler(response)
-                
                 return True, "连接成功"
-            
-            client_socket.close()
+
+            self.transport.close(conn_id)
             return False, "无效的响应"
         except Exception as e:
             return False, str(e)
-    
+
+    def _handle_connect_response(self, conn_id, response):
+        """处理主机对连接请求的响应（客户端，在网络线程中调用）"""
+        pending = self._pending.pop(conn_id)
+        if response.get("type") == "room_info":
+            # 在网络线程中登记连接，保证后续消息能被正确路由
+            host_id = response.get("host")
+            self.connections[host_id] = {
+                "conn_id": conn_id,
+                "address": self._host_address,
+                "username": "房主",
+                "ready": False
+            }
+            self._conn_peers[conn_id] = host_id
+            # 通知应用层连接成功，并发送房间信息
+            self._deliver(response)
+        pending.put(response)
+
     def create_room(self, room_name, password=""):
         """创建房间"""
         # 先启动服务器
         success, ip = self.start_server()
         if not success:
             return False, ip
-        
+
         # 创建房间信息
         self.room_info = {
             "name": room_name,
@@ -168,150 +191,164 @@ class NetworkManager:
             "host_port": self.port
         }
         self.is_host = True
-        
+
         return True, f"房间创建成功，IP: {ip}, 端口: {self.port}"
-    
-    def handle_client_messages(self, client_socket, client_id):
-        """处理从客户端接收的消息"""
-        while self.running:
-            try:
-                message = self.receive_message(client_socket)
-                if not message:
-                    break
-                
-                # 处理不同类型的消息
-                if message.get("type") == "ready_status":
-                    # 更新玩家准备状态
-                    if self.is_host and client_id in self.connections:
-                        self.connections[client_id]["ready"] = message.get("ready", False)
-                        # 广播准备状态给所有玩家
-                        self.broadcast_message({
-                            "type": "player_ready",
-                            "peer_id": client_id,
-                            "ready": message.get("ready", False)
-                        })
-                    # 转发给房主处理
-                    elif not self.is_host and list(self.connections.keys())[0] == message.get("target"):
-                        self.send_message_to(list(self.connections.keys())[0], message)
-                
-                elif message.get("type") == "start_game" and self.is_host:
-                    # 房主发起开始游戏
-                    self.broadcast_message({"type": "game_starting"})
-                
-                elif message.get("target") and message["target"] == self.peer_id:
-                    # 消息是发给我的
-                    if self.message_handler:
-                        self.message_handler(message)
-                
-                elif self.is_host and message.get("target"):
-                    # 作为房主，转发消息给目标玩家
-                    self.send_message_to(message["target"], message)
-            except Exception as e:
-                print(f"处理消息错误: {e}")
-                break
-        
-        # 处理断开连接
-        self.handle_disconnect(client_id)
-    
+
+    def _handle_client_message(self, client_id, message):
+        """处理从客户端接收的消息（在网络线程中调用）"""
+        try:
+            # 处理不同类型的消息
+            if message.get("type") == "ready_status":
+                # 更新玩家准备状态
+                if self.is_host and client_id in self.connections:
+                    self.connections[client_id]["ready"] = message.get("ready", False)
+                    # 广播准备状态给所有玩家
+                    self._broadcast({
+                        "type": "player_ready",
+                        "peer_id": client_id,
+                        "ready": message.get("ready", False)
+                    })
+                # 转发给房主处理
+                elif not self.is_host and list(self.connections.keys())[0] == message.get("target"):
+                    self._send_to(list(self.connections.keys())[0], message)
+
+            elif message.get("type") == "start_game" and self.is_host:
+                # 房主发起开始游戏
+                self._broadcast({"type": "game_starting"})
+
+            elif message.get("target") and message["target"] == self.peer_id:
+                # 消息是发给我的
+                self._deliver(message)
+
+            elif self.is_host and message.get("target"):
+                # 作为房主，转发消息给目标玩家
+                self._send_to(message["target"], message)
+        except Exception as e:
+            logger.warning("处理消息错误: %s", e)
+
     def handle_disconnect(self, client_id):
-        """处理客户端断开连接"""
+        """处理客户端断开连接（在网络线程中调用）"""
         if client_id in self.connections:
-            try:
-                self.connections[client_id]["socket"].close()
-            except:
-                pass
+            self.transport.close(self.connections[client_id]["conn_id"])
             del self.connections[client_id]
-            
+
             # 通知其他玩家
             if self.is_host:
-                self.broadcast_message({
+                self._broadcast({
                     "type": "player_left",
                     "peer_id": client_id
                 })
-            
+
             # 通知应用层
-            if self.message_handler:
-                self.message_handler({
-                    "type": "player_left",
-                    "peer_id": client_id
-                })
-    
-    def send_message(self, sock, message):
-        """发送消息到指定socket"""
+            self._deliver({
+                "type": "player_left",
+                "peer_id": client_id
+            })
+
+    def send_message(self, target, message):
+        """发送消息到指定连接
+        target可以是连接编号，也可以是旧版接口使用的socket（直接以长度前缀格式同步发送）"""
+        if not hasattr(target, "sendall"):
+            return self.transport.send(target, message)
         try:
-            message_json = json.dumps(message)
-            # 使用struct打包消息长度
-            message_length = struct.pack('!I', len(message_json))
-            sock.sendall(message_length + message_json.encode())
+            target.sendall(encode_length_prefixed(json.dumps(message).encode()))
             return True
         except Exception as e:
-            print(f"发送消息错误: {e}")
+            logger.warning("发送消息错误: %s", e)
             return False
-    
+
     def receive_message(self, sock):
-        """从socket接收消息"""
+        """从socket接收一条长度前缀格式的消息，失败时返回None（旧版接口，阻塞读取）
+        每个socket有自己的分帧缓冲区，数据用recv_into直接写入，一次收到的后续消息留给下次调用"""
+        framer = self._recv_framers.get(sock)
+        if framer is None:
+            framer = self._recv_framers[sock] = LengthPrefixFramer()
         try:
-            # 先接收消息长度
-            length_data = sock.recv(4)
-            if not length_data:
-                return None
-            
-            message_length = struct.unpack('!I', length_data)[0]
-            
-            # 接收消息内容
-            data = b''
-            while len(data) < message_length:
-                packet = sock.recv(min(4096, message_length - len(data)))
-                if not packet:
+            while True:
+                for frame in framer.frames():
+                    # 帧的memoryview在下一次写入缓冲区前有效，立即解码
+                    return json.loads(str(frame, "utf-8"))
+                if not framer.recv_into(sock):
+                    self._recv_framers.pop(sock, None)
                     return None
-                data += packet
-            
-            return json.loads(data.decode())
-        except Exception as e:
-            print(f"接收消息错误: {e}")
+        except (OSError, ValueError) as e:
+            logger.warning("接收消息错误: %s", e)
+            self._recv_framers.pop(sock, None)
             return None
-    
+
     def send_message_to(self, peer_id, message):
         """发送消息给指定的peer"""
-        if peer_id in self.connections:
-            return self.send_message(self.connections[peer_id]["socket"], message)
-        return False
-    
+        self.transport.call_soon(self._send_to, peer_id, message)
+        return True
+
     def broadcast_message(self, message, exclude=None):
         """广播消息给所有连接的客户端"""
-        if exclude is None:
-            exclude = []
-        
-        for peer_id, conn_info in list(self.connections.items()):
-            if peer_id not in exclude:
-                self.send_message(conn_info["socket"], message)
-    
+        self.transport.call_soon(self._broadcast, message, list(exclude or []))
+
+    def _send_to(self, peer_id, message):
+        if peer_id in self.connections:
+            self.transport.send_now(self.connections[peer_id]["conn_id"], message)
+
+    def _broadcast(self, message, exclude=None):
+        exclude_conns = [self.connections[peer_id]["conn_id"]
+                         for peer_id in (exclude or []) if peer_id in self.connections]
+        self.transport.broadcast_now(message, exclude_conns)
+
+    def _deliver(self, message):
+        """把消息交给应用层（在网络线程中调用）"""
+        if self.message_handler:
+            try:
+                self.message_handler(message)
+            except Exception as e:
+                logger.warning("消息处理函数错误: %s", e)
+        else:
+            self.message_queue.put(message)
+
+    def get_messages(self):
+        """取出所有待处理的消息"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.message_queue.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def dispatch_messages(self):
+        """在调用方线程中把队列中的消息（设置处理函数之前收到的）交给message_handler"""
+        messages = self.get_messages()
+        if self.message_handler:
+            for message in messages:
+                self.message_handler(message)
+        return messages
+
     def set_ready_status(self, ready):
         """设置玩家准备状态"""
         self.player_status["ready"] = ready
-        
+        self.transport.call_soon(self._send_ready_status, ready)
+
+    def _send_ready_status(self, ready):
         if self.is_host:
             # 房主直接广播自己的准备状态
-            self.broadcast_message({
+            self._broadcast({
                 "type": "player_ready",
                 "peer_id": self.peer_id,
                 "ready": ready
             })
-        else:
+        elif self.connections:
             # 普通玩家发送给房主
-            self.send_message_to(list(self.connections.keys())[0], {
+            self._send_to(list(self.connections.keys())[0], {
                 "type": "ready_status",
                 "peer_id": self.peer_id,
                 "ready": ready
             })
-    
+
     def start_game(self):
         """开始游戏（房主专用）"""
         if self.is_host:
-            self.broadcast_message({"type": "game_starting"})
+            self.transport.broadcast({"type": "game_starting"})
             return True
         return False
-    
+
     def get_local_ip(self):
         """获取本地IP地址"""
         try:
@@ -323,29 +360,15 @@ class NetworkManager:
             return ip
         except:
             return '127.0.0.1'
-    
+
     def stop(self):
         """停止网络服务"""
         self.running = False
-        
-        # 关闭所有连接
-        for conn_info in list(self.connections.values()):
-            try:
-                conn_info["socket"].close()
-            except:
-                pass
+        # 关闭所有连接和服务器，并结束网络线程
+        self.transport.stop()
         self.connections.clear()
-        
-        # 关闭服务器socket
-        if self.server_socket:
-            try:
-                self.server_socket.close()
-            except:
-                pass
-        
-        # 等待监听线程结束
-        if self.listen_thread:
-            self.listen_thread.join(1)
+        self._conn_peers.clear()
+        self._recv_framers.clear()
 
 # 测试函数
 def test_network():
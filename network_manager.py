@@ -1,25 +1,66 @@
 # 网络通信模块，负责P2P连接和消息传递
 import socket
+import queue
 import threading
-import json
 import time
 
+from async_transport import (AsyncTransport, LINE_FRAMING, EVENT_ACCEPTED,
+                             EVENT_MESSAGE, EVENT_CLOSED, EVENT_DATAGRAM)
+from game_logging import get_logger
+from udp_channel import (PACKET_STATE, PACKET_INPUT, SequenceFilter,
+                         pack_packet, unpack_packet)
+
+logger = get_logger("network_manager")
+
+# 默认的自动发送间隔（秒），主循环每帧也会调用flush()
+DEFAULT_FLUSH_INTERVAL = 1.0 / 60
+# 新消息可以完全取代同一发送者旧消息的类型
+COALESCED_TYPES = ("player_position", "player_input")
+# 客户端重发udp_hello的间隔（秒），直到收到房主的第一个UDP状态包
+UDP_HELLO_INTERVAL = 0.25
+
 class NetworkManager:
-    def __init__(self, username="玩家"):
+    def __init__(self, username="玩家", flush_interval=DEFAULT_FLUSH_INTERVAL):
         self.username = username
         self.connected = False
-        self.socket = None
-        self.server_socket = None
         self.peer_ip = None
         self.peer_port = 5555
         self.local_ip = self.get_local_ip()
         self.local_port = 5555
-        self.message_queue = []
-        self.threads = []
+        # 网络线程收到的消息通过线程安全的队列交给游戏主循环
+        self.message_queue = queue.Queue()
         self.running = False
         self.peer_id = None
         self.host_id = None
-    
+        # 所有连接都由同一个事件循环线程处理
+        self.transport = AsyncTransport(LINE_FRAMING, handler=self._handle_event)
+        # UDP不可靠通道：房间/大厅消息走TCP，每帧的位置和状态走UDP
+        self.udp_seq = {PACKET_STATE: 0, PACKET_INPUT: 0}
+        self.udp_seq_lock = threading.Lock()  # 主线程和事件循环线程都会发送UDP包
+        self.udp_filter = SequenceFilter()
+        # 房主端的对端以TCP连接编号标识；客户端的udp_hello携带房主分配的令牌（即连接编号），
+        # 据此把UDP地址对应到连接。以下字典只在事件循环线程中修改
+        self.tcp_peers = {}  # 连接编号 -> TCP对端地址
+        self.udp_peers = {}  # UDP地址 -> 连接编号
+        self.udp_addrs = {}  # 连接编号 -> UDP地址
+        self.is_client = False  # 是否通过connect()连接到房主
+        self.udp_token = None  # 客户端：房主在connection_established中分配的令牌
+        self.udp_confirmed = False  # 客户端：已收到房主的UDP状态包，不再重发udp_hello
+        # TCP发送队列：同一帧内的消息合并为一次写入，旧的位置消息被最新的取代
+        self.flush_interval = flush_interval  # None表示只在调用flush()时发送
+        self.outgoing = []
+        self.outgoing_positions = {}  # (消息类型, sender_id) -> 在outgoing中的下标
+        self.outgoing_lock = threading.Lock()
+        self.send_stats = {
+            "messages": 0,        # send_message调用次数
+            "coalesced": 0,       # 被更新的位置消息取代而未发送的消息数
+            "writes": 0,          # 实际的批量写入次数
+            "bytes_sent": 0,      # 实际写入的字节数
+            "bytes_saved": 0,     # 因合并位置消息少发送的字节数
+            "syscalls_saved": 0   # 相比每条消息一次sendall少的写入次数
+        }
+        self.tcp_peer_hosts = set()  # 允许发送UDP的对端IP
+
     def get_local_ip(self):
         """
         获取本地IP地址
@@ -32,168 +73,293 @@ class NetworkManager:
             s.close()
             return local_ip
         except Exception as e:
-            print(f"获取本地IP失败: {e}")
+            logger.warning("获取本地IP失败: %s", e)
             return "127.0.0.1"  # 默认返回本地回环地址
-    
+
     def start_server(self):
         """
         启动服务器，等待其他玩家连接
         """
         try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.server_socket.bind((self.local_ip, self.local_port))
-            self.server_socket.listen(3)  # 最多接受3个连接（总共4名玩家）
+            # 最多接受3个连接（总共4名玩家）
+            self.transport.listen(self.local_ip, self.local_port, backlog=3)
+            self._open_udp(local_addr=(self.local_ip, self.local_port))
             self.running = True
-            
-            # 启动服务器线程
-            server_thread = threading.Thread(target=self.accept_connections, daemon=True)
-            server_thread.start()
-            self.threads.append(server_thread)
-            
-            print(f"服务器已启动，IP: {self.local_ip}, 端口: {self.local_port}")
+            self._schedule_flush()
+            logger.info("服务器已启动，IP: %s, 端口: %s", self.local_ip, self.local_port)
             return True
         except Exception as e:
-            print(f"启动服务器失败: {e}")
+            logger.error("启动服务器失败: %s", e)
+            self.transport.stop()
             return False
-    
-    def accept_connections(self):
-        """
-        接受新连接的线程函数
-        """
-        while self.running:
-            try:
-                conn, addr = self.server_socket.accept()
-                self.socket = conn
-                self.peer_ip = addr[0]
-                self.connected = True
-                
-                # 启动接收消息线程
-                receive_thread = threading.Thread(target=self.receive_messages, args=(conn,), daemon=True)
-                receive_thread.start()
-                self.threads.append(receive_thread)
-                
-                # 发送连接确认消息
-                self.send_message({
-                    "type": "connection_established",
-                    "host_id": self.username,
-                    "peer_id": self.peer_id
-                })
-                
-                print(f"玩家已连接: {addr}")
-            except Exception as e:
-                if self.running:  # 只有在服务器运行时才打印错误
-                    print(f"接受连接失败: {e}")
-    
+
     def connect(self, peer_ip, peer_port=5555):
         """
         连接到其他玩家的服务器
         """
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((peer_ip, peer_port))
+            self.running = True
+            self.transport.connect(peer_ip, peer_port)
+            self._schedule_flush()
             self.peer_ip = peer_ip
             self.peer_port = peer_port
+            self.tcp_peer_hosts.add(peer_ip)
             self.connected = True
-            
-            # 启动接收消息线程
-            receive_thread = threading.Thread(target=self.receive_messages, args=(self.socket,), daemon=True)
-            receive_thread.start()
-            self.threads.append(receive_thread)
-            
-            print(f"已连接到 {peer_ip}:{peer_port}")
+            self.is_client = True
+            self._open_udp(remote_addr=(peer_ip, peer_port))
+            # 让房主知道本机的UDP地址；UDP可能丢包，定时重发直到收到房主的状态包
+            if self.transport.has_datagram:
+                self.transport.call_soon(self._send_udp_hello)
+            logger.info("已连接到 %s:%s", peer_ip, peer_port)
             return True
         except Exception as e:
-            print(f"连接失败: {e}")
+            logger.error("连接失败: %s", e)
+            self.running = False
             self.connected = False
+            self.transport.stop()
             return False
-    
-    def receive_messages(self, conn):
+
+    def _send_udp_hello(self):
         """
-        接收消息的线程函数
+        发送udp_hello并安排下一次重发（在事件循环线程中调用）
         """
-        buffer = ""
-        while self.running and self.connected:
-            try:
-                data = conn.recv(4096).decode("utf-8")
-                if not data:
-                    # 连接关闭
-                    self.connected = False
-                    print("连接已关闭")
-                    break
-                
-                buffer += data
-                # 处理缓冲区中的消息（假设消息以换行符分隔）
-                while "\n" in buffer:
-                    message_str, buffer = buffer.split("\n", 1)
-                    try:
-                        message = json.loads(message_str)
-                        self.message_queue.append(message)
-                        # 处理连接确认消息，获取peer_id
-                        if message.get("type") == "connection_established":
-                            self.host_id = message.get("host_id")
-                            if message.get("peer_id") is None:
-                                # 为客户端分配peer_id
-                                self.peer_id = f"client_{int(time.time()) % 1000}"
-                    except json.JSONDecodeError:
-                        print(f"收到无效的JSON消息: {message_str}")
-            except Exception as e:
-                if self.running and self.connected:  # 只有在连接正常时才打印错误
-                    print(f"接收消息失败: {e}")
-                    self.connected = False
-    
-    def send_message(self, message):
+        if not self.running or self.udp_confirmed:
+            return
+        if self.udp_token is not None:
+            self.send_unreliable({"type": "udp_hello", "token": self.udp_token})
+        self.transport.loop.call_later(UDP_HELLO_INTERVAL, self._send_udp_hello)
+
+    def _open_udp(self, local_addr=None, remote_addr=None):
         """
-        发送消息给连接的玩家
+        打开UDP通道，失败时只使用TCP
         """
         try:
-            if self.connected and self.socket:
-                message_str = json.dumps(message) + "\n"
-                self.socket.sendall(message_str.encode("utf-8"))
-                return True
-            else:
-                print("未连接，无法发送消息")
-                return False
+            self.transport.open_datagram(local_addr=local_addr, remote_addr=remote_addr)
         except Exception as e:
-            print(f"发送消息失败: {e}")
-            self.connected = False
+            logger.warning("UDP通道不可用，仅使用TCP: %s", e)
+
+    def _handle_event(self, event, conn_id, payload):
+        """
+        处理网络事件（在事件循环线程中调用）
+        """
+        if event == EVENT_DATAGRAM:
+            self._handle_datagram(*payload)
+        elif event == EVENT_ACCEPTED:
+            self.peer_ip = payload[0] if payload else None
+            if self.peer_ip:
+                self.tcp_peer_hosts.add(self.peer_ip)
+            self.tcp_peers[conn_id] = payload
+            self.connected = True
+            # 发送连接确认消息，udp_token用于把客户端的UDP地址对应到这个连接
+            self.transport.send_now(conn_id, {
+                "type": "connection_established",
+                "host_id": self.username,
+                "peer_id": self.peer_id,
+                "udp_token": conn_id
+            })
+            logger.info("玩家已连接: %s", payload)
+        elif event == EVENT_MESSAGE:
+            message = payload
+            # 处理连接确认消息，获取peer_id
+            if message.get("type") == "connection_established":
+                self.host_id = message.get("host_id")
+                if message.get("peer_id") is None:
+                    # 为客户端分配peer_id
+                    self.peer_id = f"client_{int(time.time()) % 1000}"
+                self.udp_token = message.get("udp_token")
+            # 记录消息来自哪个连接，房主据此区分各个客户端
+            message["peer"] = conn_id
+            self.message_queue.put(message)
+        elif event == EVENT_CLOSED:
+            self.tcp_peers.pop(conn_id, None)
+            addr = self.udp_addrs.pop(conn_id, None)
+            if addr is not None:
+                self.udp_peers.pop(addr, None)
+            if self.transport.connection_count == 0:
+                self.connected = False
+            logger.info("连接已关闭")
+        return True
+
+    def _handle_datagram(self, data, addr):
+        """
+        处理UDP数据包（在事件循环线程中调用），丢弃过期的包
+        """
+        # 只接受已建立TCP连接的对端发来的UDP包
+        if addr[0] not in self.tcp_peer_hosts:
+            return
+        try:
+            kind, seq, payload = unpack_packet(data)
+        except ValueError as e:
+            logger.debug("收到无效的UDP数据包: %s", e)
+            return
+        if not self.udp_filter.accept((addr, kind), seq):
+            return
+        peer = self.udp_peers.get(addr)
+        if kind == PACKET_STATE:
+            self.udp_confirmed = True
+            self.message_queue.put({"type": "snapshot", "payload": payload, "seq": seq,
+                                    "peer": peer})
+        elif not isinstance(payload, dict):
+            return
+        elif payload.get("type") == "udp_hello":
+            self._register_udp_peer(addr, payload.get("token"))
+        else:
+            payload["peer"] = peer
+            self.message_queue.put(payload)
+
+    def _register_udp_peer(self, addr, token):
+        """
+        按udp_hello中的令牌把UDP地址对应到TCP连接（房主端，在事件循环线程中调用）
+        """
+        if token not in self.tcp_peers or self.udp_peers.get(addr) == token:
+            return
+        old_addr = self.udp_addrs.get(token)
+        if old_addr is not None:
+            self.udp_peers.pop(old_addr, None)
+        self.udp_peers[addr] = token
+        self.udp_addrs[token] = addr
+        logger.info("连接 %s 的UDP地址: %s", token, addr)
+
+    def peers(self):
+        """
+        房主端当前连接的客户端（TCP连接编号）列表
+        """
+        return list(self.tcp_peers)
+
+    def send_unreliable(self, payload, kind=PACKET_INPUT, peer=None):
+        """
+        通过UDP发送带序号的数据包，可能丢失或被对端作为过期包丢弃
+        payload为bytes（如二进制快照）或可JSON序列化的消息；
+        房主端peer为客户端的连接编号，None表示发给所有已知UDP地址的客户端
+        UDP不可用（或peer的UDP地址未知）时返回False
+        """
+        if not self.connected or not self.transport.has_datagram:
             return False
-    
+        if self.is_client:
+            addrs = [None]  # 客户端：UDP端点已连接到房主
+        elif peer is not None:
+            addr = self.udp_addrs.get(peer)
+            if addr is None:
+                return False
+            addrs = [addr]
+        else:
+            addrs = list(self.udp_peers)
+            if not addrs:
+                return False
+        with self.udp_seq_lock:
+            self.udp_seq[kind] = (self.udp_seq[kind] + 1) & 0xFFFFFFFF
+            seq = self.udp_seq[kind]
+        data = pack_packet(kind, seq, payload)
+        for addr in addrs:
+            self.transport.send_datagram(data, addr)
+        return True
+
+    def send_message(self, message):
+        """
+        发送消息给连接的玩家
+        消息先进入发送队列，由flush()或自动发送定时器合并为一次写入
+        """
+        if not (self.connected and self.transport.running):
+            logger.debug("未连接，无法发送消息")
+            return False
+
+        with self.outgoing_lock:
+            self.send_stats["messages"] += 1
+            sender_id = message.get("sender_id")
+            message_type = message.get("type")
+            if message_type in COALESCED_TYPES and sender_id is not None:
+                # 同一发送者的位置/输入消息只保留最新的一条（输入消息携带全部未确认输入）
+                key = (message_type, sender_id)
+                index = self.outgoing_positions.get(key)
+                if index is not None:
+                    replaced = self.outgoing[index]
+                    self.outgoing[index] = message
+                    self.send_stats["coalesced"] += 1
+                    self.send_stats["syscalls_saved"] += 1
+                    self.send_stats["bytes_saved"] += len(self.transport.encode(replaced))
+                    return True
+                self.outgoing_positions[key] = len(self.outgoing)
+            self.outgoing.append(message)
+        return True
+
+    def flush(self):
+        """
+        把发送队列中的所有消息编码后一次性写出，返回写出的字节数
+        """
+        # 主线程和事件循环线程（_auto_flush）都会调用flush()，取出批次和安排写入必须在同一个锁内完成，
+        # 否则后取出的批次可能先被写出
+        with self.outgoing_lock:
+            if not self.outgoing:
+                return 0
+            batch = self.outgoing
+            self.outgoing = []
+            self.outgoing_positions = {}
+            if not self.transport.running:
+                return 0
+            data = b"".join(self.transport.encode(message) for message in batch)
+            self.transport.broadcast_raw(data)
+            self.send_stats["writes"] += 1
+            self.send_stats["bytes_sent"] += len(data)
+            self.send_stats["syscalls_saved"] += len(batch) - 1
+        return len(data)
+
+    def _schedule_flush(self):
+        """
+        按flush_interval在事件循环线程中定时发送队列中的消息
+        """
+        if self.flush_interval is not None:
+            self.transport.call_later(self.flush_interval, self._auto_flush)
+
+    def _auto_flush(self):
+        if not self.running:
+            return
+        self.flush()
+        self.transport.loop.call_later(self.flush_interval, self._auto_flush)
+
+    def send_message_to(self, peer, message):
+        """
+        发送消息给指定连接编号的玩家，先发出队列中的消息以保证顺序
+        """
+        if self.connected and self.transport.running:
+            self.flush()
+            return self.transport.send(peer, message)
+        return False
+
+    def broadcast_message(self, message, exclude=None):
+        """
+        广播消息给所有连接的玩家，exclude为不需要发送的连接编号
+        """
+        if self.connected and self.transport.running:
+            # 先发出队列中的消息，保证消息顺序
+            self.flush()
+            return self.transport.broadcast(message, exclude)
+        return False
+
     def get_messages(self):
         """
         获取接收到的消息列表
         """
-        messages = self.message_queue.copy()
-        self.message_queue.clear()
-        return messages
-    
+        messages = []
+        while True:
+            try:
+                messages.append(self.message_queue.get_nowait())
+            except queue.Empty:
+                return messages
+
     def disconnect(self):
         """
         断开连接，清理资源
         """
+        # 先发出队列中剩余的消息（如离开房间的通知）
+        self.flush()
         self.running = False
-        
-        # 关闭socket
-        if self.socket:
-            try:
-                self.socket.close()
-            except Exception:
-                pass
-            self.socket = None
-        
-        if self.server_socket:
-            try:
-                self.server_socket.close()
-            except Exception:
-                pass
-            self.server_socket = None
-        
-        # 等待线程结束
-        for thread in self.threads:
-            if thread.is_alive():
-                thread.join(timeout=1.0)  # 等待1秒
-        
-        self.threads.clear()
+        self.transport.stop()
         self.connected = False
-        self.message_queue.clear()
-        print("已断开连接并清理资源")
\ No newline at end of file
+        self.tcp_peers.clear()
+        self.udp_peers.clear()
+        self.udp_addrs.clear()
+        self.udp_token = None
+        self.udp_confirmed = False
+        self.udp_filter.reset()
+        self.get_messages()
+        logger.info("已断开连接并清理资源")
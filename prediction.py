@@ -0,0 +1,66 @@
+# 客户端预测模块，本地坦克立即响应输入，收到房主的权威状态后重放未确认的输入
+#
+# 流程：
+#   1. 客户端每帧为本地输入分配递增的序号，立即在本地模拟并记录到缓冲区
+#   2. 输入（连同所有未确认的输入，防止UDP丢包）发送给房主
+#   3. 房主按序号在自己的GameEngine上权威模拟，并在快照中带回已处理的最大序号
+#   4. 客户端收到快照后把坦克放回权威位置，丢弃已确认的输入并重放其余输入
+from collections import deque
+
+# 每个输入包中最多携带的未确认输入数量
+MAX_INPUTS_PER_PACKET = 10
+
+
+class PredictionBuffer:
+    """
+    本地坦克的输入预测缓冲区
+    """
+    def __init__(self, max_pending=120):
+        self.seq = 0
+        self.acked_seq = 0
+        self.pending = deque(maxlen=max_pending)  # (seq, direction)
+        self.corrections = 0  # 预测与权威状态不一致的次数
+
+    def record(self, direction):
+        """
+        记录一次本地输入，返回分配的序号
+        """
+        self.seq += 1
+        self.pending.append((self.seq, direction))
+        return self.seq
+
+    def unacknowledged(self, limit=MAX_INPUTS_PER_PACKET):
+        """
+        最近的未确认输入，按序号从小到大排列，用于发送
+        """
+        inputs = list(self.pending)[-limit:]
+        return [[seq, direction] for seq, direction in inputs]
+
+    def reconcile(self, engine, player_id, x, y, acked_seq):
+        """
+        以房主的权威位置为起点重放未确认的输入，返回预测是否被修正
+        """
+        if acked_seq < self.acked_seq:
+            return False
+        self.acked_seq = acked_seq
+        while self.pending and self.pending[0][0] <= acked_seq:
+            self.pending.popleft()
+
+        tank = engine.get_tank(player_id)
+        if tank is None:
+            return False
+        predicted = (tank.rect.x, tank.rect.y)
+        tank.rect.x = x
+        tank.rect.y = y
+        for _, direction in self.pending:
+            engine.simulate_input(tank, direction)
+
+        corrected = (tank.rect.x, tank.rect.y) != predicted
+        if corrected:
+            self.corrections += 1
+        return corrected
+
+    def reset(self):
+        self.seq = 0
+        self.acked_seq = 0
+        self.pending.clear()
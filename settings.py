@@ -1,6 +1,55 @@
 import os
+import re
 from pygame import Rect
 
+# 图像资源清单：名称 -> 目录。目录内容在第一次使用时才读取，导入settings不访问文件系统
+IMAGE_ROOT = "resources/images"
+IMAGE_MANIFEST = {
+    "hero": f"{IMAGE_ROOT}/hero",
+    "enemy": f"{IMAGE_ROOT}/enemy",
+    "bullet": f"{IMAGE_ROOT}/bullet",
+    "walls": f"{IMAGE_ROOT}/walls",
+    "boom": f"{IMAGE_ROOT}/boom",
+    "bullet_boom": f"{IMAGE_ROOT}/bullet_boom"
+}
+IMAGE_EXTENSIONS = (".gif", ".png")
+
+_image_lists = {}
+
+
+def _natural_key(name):
+    # blast2.gif排在blast10.gif之前
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def list_images(name):
+    """
+    返回清单中某个目录下的图像路径，按文件名自然排序，与目录的遍历顺序无关
+    """
+    files = _image_lists.get(name)
+    if files is None:
+        directory = IMAGE_MANIFEST[name]
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            entries = []
+        files = _image_lists[name] = [
+            f"{directory}/{file}" for file in sorted(entries, key=_natural_key)
+            if file.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+    return files
+
+
+class _ImageList:
+    """
+    类属性形式的延迟图像列表，第一次访问Settings.XXX时才读取目录
+    """
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        return list_images(self.name)
+
 
 class Settings:
 
@@ -11,6 +60,9 @@ class Settings:
     BOX_RECT = Rect(0, 0, BOX_SIZE, BOX_SIZE)   # 单位屏幕矩形
     SCREEN_RECT = Rect(0, 0, BOX_SIZE * 19, BOX_SIZE * 13)  # 屏幕矩形
     SCREEN_COLOR = (0, 0, 0)    # 屏幕颜色
+    TEXTURE_ATLAS = False  # 把所有图像打包到一张纹理图集（软件渲染下没有收益，默认关闭）
+    DIRTY_RECTS = True  # 游戏画面只刷新变化的区域，软件渲染时比整屏flip快得多
+    NUMPY_BULLETS = False  # 用NumPy子弹池（bullet_pool.BulletPool）批量模拟子弹，子弹很多时更快，需要安装numpy
 
     # 通用变量
     LEFT = 0
@@ -77,11 +129,7 @@ class Settings:
     IRON_WALL = 2
     WEED_WALL = 3
     BOSS_WALL = 5
-    WALLS = [
-        f"resources/images/walls/{file}" for file in os.listdir("resources/images/walls/")
-    ]
+    WALLS = _ImageList("walls")
 
-    # 爆炸的图片
-    BOOMS = [
-        "resources/images/boom/" + file for file in os.listdir("resources/images/boom")
-    ]
+    # 爆炸的图片（按帧序号排序）
+    BOOMS = _ImageList("boom")
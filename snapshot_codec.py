@@ -0,0 +1,304 @@
+# 快照编码模块，把GameEngine.get_game_state()的结果编码为紧凑的二进制增量快照
+#
+# 每个快照都相对于对端最近确认（ack）的快照做增量编码：
+#   - 与基准快照相同的坦克不写入任何字节
+#   - 墙壁只写入自基准快照以来新摧毁的格子
+#   - 子弹没有稳定的标识且每帧都在移动，因此总是完整写入（每颗6字节）
+# 基准序号为0表示相对于空状态编码，即完整快照
+import struct
+from collections import OrderedDict
+
+VERSION = 2
+
+# 方向字符串与编码值的对应关系
+DIRECTIONS = ("up", "down", "left", "right")
+DIRECTION_INDEX = {direction: index for index, direction in enumerate(DIRECTIONS)}
+
+# 头部：版本、序号、基准序号、标志位、房主帧号
+HEADER = struct.Struct("!BIIBI")
+COUNT = struct.Struct("!H")
+TANK_HEAD = struct.Struct("!BB")
+UINT = struct.Struct("!I")
+BULLET = struct.Struct("!hhBB")
+WALL = struct.Struct("!BB")
+SHORT = struct.Struct("!h")
+BYTE = struct.Struct("!B")
+
+# 头部标志位
+FLAG_GAME_OVER = 0x01
+FLAG_WINNER = 0x02
+
+# 坦克记录的字段掩码
+FIELD_X = 0x01
+FIELD_Y = 0x02
+FIELD_HEALTH = 0x04
+FIELD_DIRECTION = 0x08
+FIELD_INPUT_SEQ = 0x10
+FIELD_REMOVED = 0x40
+FIELD_NEW = 0x80
+
+# 子弹所属坦克不在槽位表中时使用的编号
+NO_OWNER = 0xFF
+MAX_SLOTS = 0xFF
+
+
+def _normalize(game_state):
+    """
+    把get_game_state()的字典转换为便于比较的形式
+    tanks: player_id -> (x, y, health, direction_index, input_seq)
+    walls: 已摧毁墙壁的 (列, 行) 集合
+    """
+    tanks = {}
+    for tank in game_state.get("tanks", []):
+        tanks[tank["id"]] = (int(tank["x"]), int(tank["y"]), int(tank["health"]),
+                             DIRECTION_INDEX.get(tank["direction"], 0),
+                             int(tank.get("input_seq", 0)))
+    walls = {tuple(tile) for tile in game_state.get("destroyed_walls", [])}
+    return tanks, walls
+
+
+def _pack_str(text):
+    data = text.encode("utf-8")[:255]
+    return BYTE.pack(len(data)) + data
+
+
+class SnapshotEncoder:
+    """
+    快照编码器（发送端）
+    保存最近发送的快照，收到确认后以确认的快照作为下一次编码的基准
+    """
+    def __init__(self, history_size=64):
+        self.seq = 0
+        self.acked_seq = 0
+        self.history_size = history_size
+        self.history = OrderedDict()  # seq -> (tanks, walls)
+        self.slots = {}  # player_id -> 槽位编号
+
+    def acknowledge(self, seq):
+        """
+        对端确认收到序号为seq的快照
+        """
+        if seq <= self.acked_seq or seq not in self.history:
+            return
+        self.acked_seq = seq
+        # 比确认序号更早的快照不会再被用作基准
+        for old_seq in list(self.history):
+            if old_seq >= seq:
+                break
+            del self.history[old_seq]
+
+    def _slot(self, player_id):
+        slot = self.slots.get(player_id)
+        if slot is None:
+            if len(self.slots) >= MAX_SLOTS:
+                raise ValueError("坦克数量超过快照槽位上限")
+            slot = len(self.slots)
+            self.slots[player_id] = slot
+        return slot
+
+    def encode(self, game_state):
+        """
+        编码一个快照，返回bytes
+        """
+        tanks, walls = _normalize(game_state)
+        self.seq += 1
+
+        baseline_seq = self.acked_seq if self.acked_seq in self.history else 0
+        if baseline_seq:
+            base_tanks, base_walls = self.history[baseline_seq]
+        else:
+            base_tanks, base_walls = {}, set()
+
+        flags = 0
+        if game_state.get("game_over"):
+            flags |= FLAG_GAME_OVER
+        winner_id = game_state.get("winner_id")
+        if winner_id is not None:
+            flags |= FLAG_WINNER
+
+        frame = int(game_state.get("frame", 0)) & 0xFFFFFFFF
+        parts = [HEADER.pack(VERSION, self.seq, baseline_seq, flags, frame)]
+        if winner_id is not None:
+            parts.append(_pack_str(str(winner_id)))
+
+        # 坦克：只写入与基准不同的字段
+        records = []
+        for player_id, values in tanks.items():
+            slot = self._slot(player_id)
+            base = base_tanks.get(player_id)
+            mask = 0
+            fields = []
+            if base is None:
+                mask |= FIELD_NEW
+            x, y, health, direction, input_seq = values
+            if base is None or base[0] != x:
+                mask |= FIELD_X
+                fields.append(SHORT.pack(x))
+            if base is None or base[1] != y:
+                mask |= FIELD_Y
+                fields.append(SHORT.pack(y))
+            if base is None or base[2] != health:
+                mask |= FIELD_HEALTH
+                fields.append(SHORT.pack(health))
+            if base is None or base[3] != direction:
+                mask |= FIELD_DIRECTION
+                fields.append(BYTE.pack(direction))
+            if base is None or base[4] != input_seq:
+                mask |= FIELD_INPUT_SEQ
+                fields.append(UINT.pack(input_seq))
+            if not mask:
+                continue
+            record = [TANK_HEAD.pack(slot, mask)]
+            if mask & FIELD_NEW:
+                record.append(_pack_str(str(player_id)))
+            record.extend(fields)
+            records.append(b"".join(record))
+        for player_id in base_tanks:
+            if player_id not in tanks:
+                records.append(TANK_HEAD.pack(self.slots[player_id], FIELD_REMOVED))
+        parts.append(COUNT.pack(len(records)))
+        parts.extend(records)
+
+        # 子弹：完整写入
+        bullets = game_state.get("bullets", [])
+        parts.append(COUNT.pack(len(bullets)))
+        for bullet in bullets:
+            owner = self.slots.get(bullet.get("owner_id"), NO_OWNER)
+            parts.append(BULLET.pack(int(bullet["x"]), int(bullet["y"]),
+                                     DIRECTION_INDEX.get(bullet["direction"], 0), owner))
+
+        # 墙壁：只写入新摧毁的格子
+        new_walls = sorted(walls - base_walls)
+        parts.append(COUNT.pack(len(new_walls)))
+        for col, row in new_walls:
+            parts.append(WALL.pack(col, row))
+
+        self.history[self.seq] = (tanks, walls)
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+        return b"".join(parts)
+
+
+class SnapshotDecoder:
+    """
+    快照解码器（接收端）
+    保存最近解码的完整状态，用于还原以它们为基准的增量快照
+    """
+    def __init__(self, history_size=64):
+        self.latest_seq = 0
+        self.history_size = history_size
+        # seq -> (slot -> [player_id, x, y, health, direction, input_seq], 已摧毁墙壁集合)
+        self.history = OrderedDict()
+
+    def decode(self, data):
+        """
+        解码快照，返回 (seq, game_state)；过期的快照返回 (seq, None)
+        基准快照未知、数据被截断或格式错误时抛出ValueError，解码器状态保持不变
+        """
+        try:
+            return self._decode(data)
+        except (struct.error, KeyError, IndexError) as e:
+            raise ValueError(f"快照数据损坏: {e!r}") from e
+
+    def _decode(self, data):
+        view = memoryview(data)
+        version, seq, baseline_seq, flags, frame = HEADER.unpack_from(view, 0)
+        offset = HEADER.size
+        if version != VERSION:
+            raise ValueError(f"不支持的快照版本: {version}")
+        if seq <= self.latest_seq:
+            return seq, None
+
+        if baseline_seq:
+            if baseline_seq not in self.history:
+                raise ValueError(f"未知的基准快照: {baseline_seq}")
+            base_tanks, base_walls = self.history[baseline_seq]
+            tanks = {slot: list(values) for slot, values in base_tanks.items()}
+            walls = set(base_walls)
+        else:
+            tanks, walls = {}, set()
+
+        winner_id = None
+        if flags & FLAG_WINNER:
+            winner_id, offset = self._read_str(view, offset)
+
+        (count,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        for _ in range(count):
+            slot, mask = TANK_HEAD.unpack_from(view, offset)
+            offset += TANK_HEAD.size
+            if mask & FIELD_REMOVED:
+                tanks.pop(slot, None)
+                continue
+            if mask & FIELD_NEW:
+                player_id, offset = self._read_str(view, offset)
+                tanks[slot] = [player_id, 0, 0, 0, 0, 0]
+            values = tanks[slot]
+            if mask & FIELD_X:
+                values[1] = SHORT.unpack_from(view, offset)[0]
+                offset += SHORT.size
+            if mask & FIELD_Y:
+                values[2] = SHORT.unpack_from(view, offset)[0]
+                offset += SHORT.size
+            if mask & FIELD_HEALTH:
+                values[3] = SHORT.unpack_from(view, offset)[0]
+                offset += SHORT.size
+            if mask & FIELD_DIRECTION:
+                values[4] = BYTE.unpack_from(view, offset)[0]
+                offset += BYTE.size
+            if mask & FIELD_INPUT_SEQ:
+                values[5] = UINT.unpack_from(view, offset)[0]
+                offset += UINT.size
+
+        bullets = []
+        (count,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        for _ in range(count):
+            x, y, direction, owner = BULLET.unpack_from(view, offset)
+            offset += BULLET.size
+            owner_id = tanks[owner][0] if owner in tanks else None
+            bullets.append({
+                "x": x,
+                "y": y,
+                "direction": DIRECTIONS[direction],
+                "owner_id": owner_id
+            })
+
+        (count,) = COUNT.unpack_from(view, offset)
+        offset += COUNT.size
+        for _ in range(count):
+            walls.add(WALL.unpack_from(view, offset))
+            offset += WALL.size
+        if offset != len(view):
+            raise ValueError(f"快照末尾有 {len(view) - offset} 个多余的字节")
+
+        self.latest_seq = seq
+        self.history[seq] = (tanks, walls)
+        while len(self.history) > self.history_size:
+            self.history.popitem(last=False)
+
+        game_state = {
+            "tanks": [{
+                "id": player_id,
+                "x": x,
+                "y": y,
+                "health": health,
+                "direction": DIRECTIONS[direction],
+                "input_seq": input_seq
+            } for player_id, x, y, health, direction, input_seq in tanks.values()],
+            "bullets": bullets,
+            "destroyed_walls": sorted(walls),
+            "frame": frame,
+            "game_over": bool(flags & FLAG_GAME_OVER),
+            "winner_id": winner_id
+        }
+        return seq, game_state
+
+    @staticmethod
+    def _read_str(view, offset):
+        (length,) = BYTE.unpack_from(view, offset)
+        offset += BYTE.size
+        if offset + length > len(view):
+            raise ValueError("快照中的字符串被截断")
+        text = bytes(view[offset:offset + length]).decode("utf-8")
+        return text, offset + length
@@ -1,13 +1,17 @@
 import os
+import sys
 import time
 import random
 
 # 禁用libpng警告
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
-os.environ['SDL_AUDIODRIVER'] = 'directsound'
+# 只在Windows上默认使用directsound，不覆盖已设置的驱动（如无界面运行时的dummy）
+if sys.platform == 'win32':
+    os.environ.setdefault('SDL_AUDIODRIVER', 'directsound')
 
 import pygame
 from settings import Settings
+import assets
 
 # 图像和音效缓存
 IMAGE_CACHE = {}
@@ -25,7 +29,7 @@ class BaseSprite(pygame.sprite.Sprite):
         self.speed = None
         # 使用图像缓存避免重复加载
         if image_name not in IMAGE_CACHE:
-            IMAGE_CACHE[image_name] = pygame.image.load(image_name)
+            IMAGE_CACHE[image_name] = assets.get_image(image_name)
         self.image = IMAGE_CACHE[image_name]
         self.rect = self.image.get_rect()
 
@@ -45,33 +49,35 @@ class BaseSprite(pygame.sprite.Sprite):
             self.rect.y += self.speed
 
 
+# 子弹图像默认朝右，各方向需要逆时针旋转的角度
+BULLET_ANGLES = {
+    Settings.RIGHT: 0,
+    Settings.LEFT: 180,
+    Settings.UP: 90,
+    Settings.DOWN: -90
+}
+
+
 class Bullet(BaseSprite):
 
     def __init__(self, image_name, screen):
         super().__init__(image_name, screen)
+        self.image_name = image_name
         self.speed = Settings.BULLET_SPEED
         self.original_image = self.image  # 保存原始图像，用于旋转
     
     def rotate(self):
         """
-        根据方向旋转子弹图像
+        根据方向切换到预先旋转好的子弹图像（所有子弹共享，不创建新的Surface）
         """
-        if self.direction == Settings.RIGHT:
-            # 向右方向，无需旋转（默认可能就是向右）
-            pass
-        elif self.direction == Settings.LEFT:
-            # 向左方向，旋转180度
-            self.image = pygame.transform.rotate(self.original_image, 180)
-        elif self.direction == Settings.UP:
-            # 向上方向，旋转90度（逆时针）
-            self.image = pygame.transform.rotate(self.original_image, 90)
-        elif self.direction == Settings.DOWN:
-            # 向下方向，旋转270度（顺时针）或-90度
-            self.image = pygame.transform.rotate(self.original_image, -90)
+        angle = BULLET_ANGLES.get(self.direction)
+        if angle is None:
+            return
+        self.image = assets.get_rotated(self.image_name, angle)
         
-        # 更新矩形位置以保持中心不变
+        # 更新矩形大小并保持中心不变
         old_center = self.rect.center
-        self.rect = self.image.get_rect()
+        self.rect.size = self.image.get_size()
         self.rect.center = old_center
 
 
@@ -165,7 +171,7 @@ class TankSprite(BaseSprite):
         # 使用图像缓存播放爆炸动画
         for boom in Settings.BOOMS:
             if boom not in IMAGE_CACHE:
-                IMAGE_CACHE[boom] = pygame.image.load(boom)
+                IMAGE_CACHE[boom] = assets.get_image(boom)
             self.image = IMAGE_CACHE[boom]
             # 只更新精灵组，不直接更新显示，由主循环统一管理更新
             # pygame.display.update(self.rect)
@@ -194,7 +200,7 @@ class Hero(TankSprite):
     def __turn(self):
         image_name = Settings.HERO_IMAGES.get(self.direction)
         if image_name not in IMAGE_CACHE:
-            IMAGE_CACHE[image_name] = pygame.image.load(image_name)
+            IMAGE_CACHE[image_name] = assets.get_image(image_name)
         self.image = IMAGE_CACHE[image_name]
 
     def hit_wall(self):
@@ -241,7 +247,7 @@ class Enemy(TankSprite):
         self.terminal = float(random.randint(40*2, 40*8))
         image_name = Settings.ENEMY_IMAGES.get(self.direction)
         if image_name not in IMAGE_CACHE:
-            IMAGE_CACHE[image_name] = pygame.image.load(image_name)
+            IMAGE_CACHE[image_name] = assets.get_image(image_name)
         self.image = IMAGE_CACHE[image_name]
 
     def random_shot(self):
@@ -310,7 +316,7 @@ class Wall(BaseSprite):
         # 使用图像缓存播放爆炸动画
         for boom in Settings.BOOMS:
             if boom not in IMAGE_CACHE:
-                IMAGE_CACHE[boom] = pygame.image.load(boom)
+                IMAGE_CACHE[boom] = assets.get_image(boom)
             self.image = IMAGE_CACHE[boom]
             # 只更新精灵组，不直接更新显示，由主循环统一管理更新
             # pygame.display.update(self.rect)
@@ -0,0 +1,57 @@
+# 启动耗时测试模块，测量从启动Python进程到显示第一帧的时间
+#
+# 以子进程方式多次启动游戏（与python main.py相同，SDL虚拟驱动，显示第一帧后退出），
+# 以及只导入无界面模拟所需模块的 python -c "import headless"，统计墙钟时间。
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 测试项目：名称 -> 子进程参数
+TARGETS = {
+    # 导入main并运行主循环，显示第一帧后退出
+    "main": ["-c", "import main; main.TankWar().run_game(exit_after_first_frame=True)"],
+    "headless": ["-c", "import headless"]
+}
+
+
+def measure(args, runs=5):
+    """
+    运行runs次子进程，返回每次的耗时（毫秒）
+    """
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, env=env, check=True,
+                       stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="坦克大战启动耗时测试")
+    parser.add_argument("--runs", type=int, default=5, help="每个项目的运行次数")
+    parser.add_argument("targets", nargs="*", help=f"测试项目 {list(TARGETS)}，默认全部")
+    args = parser.parse_args()
+    for name in args.targets:
+        if name not in TARGETS:
+            parser.error(f"未知的测试项目: {name}")
+
+    for name in args.targets or TARGETS:
+        timings = measure(TARGETS[name], args.runs)
+        print(f"{name}: 平均 {statistics.mean(timings):.0f} ms，"
+              f"最快 {min(timings):.0f} ms，最慢 {max(timings):.0f} ms（{args.runs} 次）")
+
+
+if __name__ == "__main__":
+    main()
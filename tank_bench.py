@@ -0,0 +1,70 @@
+# 坦克碰撞性能测试模块，对比坦克之间推开处理的排序扫掠与逐对检查
+#
+# 在与坦克数量成比例的区域内随机放置坦克（密度与9辆坦克的标准地图相同），
+# 两种方式从相同的位置出发，统计平均每次耗时并确认推开后的位置完全一致。
+# --dense把所有坦克挤在一个小区域内，用于检验推开距离超出外扩范围时的退回处理。
+import os
+
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import random
+import time
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from game_engine import GameEngine, Tank
+
+# 标准地图上的坦克数量（1名玩家 + 敌人），用于换算测试区域的大小
+BASE_TANKS = 9
+
+
+def random_positions(count, seed, dense=False):
+    """
+    在面积与坦克数量成正比的区域内随机生成坦克位置
+    """
+    rng = random.Random(seed)
+    if dense:
+        return [(rng.randrange(60), rng.randrange(60)) for _ in range(count)]
+    scale = (count / BASE_TANKS) ** 0.5
+    width = int(SCREEN_WIDTH * scale)
+    height = int(SCREEN_HEIGHT * scale)
+    return [(rng.randrange(width - 30), rng.randrange(height - 30)) for _ in range(count)]
+
+
+def measure(engine, separate, positions, repeats):
+    """
+    每次从相同的位置出发调用separate()，返回平均耗时（毫秒）和最后一次的结果位置
+    """
+    elapsed = 0.0
+    for _ in range(repeats):
+        for tank, (x, y) in zip(engine.tanks, positions):
+            tank.rect.x, tank.rect.y = x, y
+        start = time.perf_counter()
+        separate()
+        elapsed += time.perf_counter() - start
+    return elapsed / repeats * 1000, [(tank.rect.x, tank.rect.y) for tank in engine.tanks]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="坦克碰撞性能测试")
+    parser.add_argument("--repeats", type=int, default=200, help="每种坦克数量的重复次数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    parser.add_argument("--dense", action="store_true", help="所有坦克挤在60x60的区域内")
+    parser.add_argument("counts", nargs="*", type=int, default=[8, 64, 256], help="坦克数量")
+    args = parser.parse_args()
+
+    for count in args.counts:
+        engine = GameEngine()
+        engine.tanks = [Tank(0, 0, f"tank_{i}", f"坦克{i}") for i in range(count)]
+        positions = random_positions(count, args.seed, args.dense)
+        sweep_ms, sweep_result = measure(engine, engine._separate_tanks_sweep, positions, args.repeats)
+        pairwise_ms, pairwise_result = measure(engine, engine._separate_tanks_pairwise,
+                                               positions, args.repeats)
+        same = "一致" if sweep_result == pairwise_result else "不一致"
+        print(f"{count} 辆坦克: 排序扫掠 {sweep_ms:.3f} ms，逐对检查 {pairwise_ms:.3f} ms，结果{same}")
+
+
+if __name__ == "__main__":
+    main()
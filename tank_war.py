@@ -1,17 +1,21 @@
 import os
+import sys
 
 # 禁用libpng警告
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
-os.environ['SDL_AUDIODRIVER'] = 'directsound'
+# 只在Windows上默认使用directsound，不覆盖已设置的驱动
+if sys.platform == 'win32':
+    os.environ.setdefault('SDL_AUDIODRIVER', 'directsound')
 
 import pygame
 from sprites import *
+import assets
+import fonts
 import game_engine
 import game_state_manager
 import ui_manager
 import time
 import random
-from network_manager import NetworkManager
 
 
 class TankWar:
@@ -39,6 +43,8 @@ class TankWar:
         self.__init_game()
         
         self.screen = pygame.display.set_mode(Settings.SCREEN_RECT.size)
+        # 一次性加载所有图像并转换为显示格式
+        assets.preload(atlas=Settings.TEXTURE_ATLAS)
         self.clock = pygame.time.Clock()
         self.game_still = True
         self.hero = None
@@ -595,6 +601,7 @@ class TankWar:
                         # 简化实现：假设有一个已知的IP地址（实际应该扫描局域网）
                         try:
                             peer_ip = input("请输入房间IP地址: ")
+                            from network_manager import NetworkManager
                             self.network_manager = NetworkManager(username=self.username)
                             self.network_manager.connect(peer_ip)
                             # 发送加入请求
@@ -952,11 +959,11 @@ class TankWar:
         self.game_engine.update()
         self.game_engine.render()
         
-        # 额外绘制玩家名称
+        # 额外绘制玩家名称（字体只创建一次，名称文字从缓存中取）
+        name_font = fonts.get_font(None, 24)
         for player_id, tank in self.player_tanks.items():
             if hasattr(tank, 'is_alive') and tank.is_alive:
-                font = pygame.font.SysFont(None, 24)
-                name_text = font.render(tank.username, True, (255, 255, 255))
+                name_text = fonts.render_text(tank.username, (255, 255, 255), name_font)
                 name_rect = name_text.get_rect(center=(tank.rect.centerx, tank.rect.top - 15))
                 self.screen.blit(name_text, name_rect)
 
@@ -1024,5 +1031,6 @@ class TankWar:
         from sprites import IMAGE_CACHE, SOUND_CACHE
         IMAGE_CACHE.clear()
         SOUND_CACHE.clear()
+        fonts.clear()
         pygame.quit()
         exit()
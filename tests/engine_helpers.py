@@ -0,0 +1,27 @@
+# 测试和性能测试共用的引擎场景
+import random
+
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from game_engine import GameEngine, Tank
+from settings import Settings
+
+DIRECTIONS = ["up", "down", "left", "right"]
+
+
+def random_bullets(count, seed):
+    """
+    随机子弹 (x, y, 方向, 发射者ID)，发射者为player_0到player_3
+    """
+    rng = random.Random(seed)
+    return [(rng.randrange(SCREEN_WIDTH), rng.randrange(SCREEN_HEIGHT),
+             rng.choice(DIRECTIONS), f"player_{rng.randrange(4)}") for _ in range(count)]
+
+
+def new_engine(numpy_bullets=False):
+    """
+    加载地图的引擎；两辆坦克放在屏幕外，保证游戏不会结束且不会被子弹击中
+    """
+    engine = GameEngine(numpy_bullets=numpy_bullets)
+    engine.load_map(Settings.MAP_ONE)
+    engine.tanks = [Tank(-1000, -1000, "a", "a"), Tank(-2000, -2000, "b", "b")]
+    return engine
@@ -0,0 +1,103 @@
+# bullet_pool.BulletPool与GameEngine逐个处理子弹的一致性测试
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from bullet_pool import BulletPool
+from engine_helpers import new_engine, random_bullets
+from game_engine import Tank
+
+
+def test_simultaneous_hits_on_destructible_wall():
+    # 一块可摧毁的墙：第一颗子弹摧毁它，同一帧的第二颗子弹继续飞行；不可摧毁的墙挡住两颗
+    solid = np.zeros((4, 4), dtype=bool)
+    solid[1, 1] = solid[1, 3] = True
+    destructible = np.zeros((4, 4), dtype=bool)
+    destructible[1, 1] = True
+    pool = BulletPool(capacity=4, tile_size=30, bounds=(1000, 1000))
+    pool.spawn(35, 65, "up", "a")
+    pool.spawn(45, 65, "up", "b")
+    pool.spawn(95, 65, "up", "a")
+    pool.spawn(105, 65, "up", "b")
+    cols, rows, _ = pool.step(solid, destructible)
+    assert sorted(zip(cols.tolist(), rows.tolist())) == [(1, 1), (3, 1), (3, 1)]
+    assert pool.states() == [{"x": 45, "y": 59, "direction": "up", "owner_id": "b"}]
+
+
+def test_fast_bullet_sweeps_through_wall():
+    # 一帧移动60像素的子弹越过整块墙也算命中；在墙中发射、一帧内离开的子弹不算命中
+    solid = np.zeros((4, 4), dtype=bool)
+    solid[1, 1] = True
+    pool = BulletPool(capacity=2, tile_size=30, bounds=(1000, 1000))
+    pool.spawn(35, 75, "up", "a", speed=60)
+    pool.spawn(35, 45, "down", "a", speed=40)
+    cols, rows, _ = pool.step(solid)
+    assert list(zip(cols.tolist(), rows.tolist())) == [(1, 1)]
+    assert pool.states() == [{"x": 35, "y": 85, "direction": "down", "owner_id": "a"}]
+
+
+def run_backends(specs, ticks, tanks=(), speeds=None):
+    """
+    分别用Bullet对象和BulletPool驱动同样的引擎，每帧比较游戏状态
+    speeds为每颗子弹的速度（默认与Bullet相同）
+    """
+    engines = [new_engine(), new_engine(numpy_bullets=True)]
+    for engine in engines:
+        engine.tanks.extend(Tank(x, y, player_id, player_id) for x, y, player_id in tanks)
+
+    speeds = speeds or [6] * len(specs)
+
+    def refill(engine):
+        # 子弹寿命只有60帧，每帧补充子弹
+        if engine.bullet_pool is not None:
+            n = len(engine.bullet_pool)
+            for spec, speed in zip(specs[n:], speeds[n:]):
+                engine.bullet_pool.spawn(*spec, speed=speed)
+        else:
+            n = len(engine.bullets)
+            for spec, speed in zip(specs[n:], speeds[n:]):
+                engine.bullets.spawn(*spec).speed = speed
+
+    for _ in range(ticks):
+        for engine in engines:
+            refill(engine)
+            engine.update()
+        assert engines[1].get_game_state() == engines[0].get_game_state()
+    return engines[0]
+
+
+def test_matches_engine():
+    engine = run_backends(random_bullets(3000, 2), 120)
+    assert engine.destroyed_walls
+
+
+def test_matches_engine_with_tank_hits():
+    # 坦克的ID与子弹发射者相同，被击中直至摧毁
+    tanks = [(300, 250, "player_0"), (600, 250, "player_1"), (300, 450, "player_2"),
+             (620, 480, "player_3")]
+    engine = run_backends(random_bullets(2000, 3), 60, tanks)
+    assert any(tank.health < 100 for tank in engine.tanks)
+    assert any(not tank.active for tank in engine.tanks)
+
+
+def test_matches_engine_with_fast_bullets():
+    specs = random_bullets(1500, 4)
+    rng = random.Random(4)
+    speeds = [rng.randrange(6, 80) for _ in specs]
+    engine = run_backends(specs, 40, [(300, 250, "player_0")], speeds)
+    assert engine.destroyed_walls
+
+
+def test_headless_match_matches_engine():
+    # 引擎内置AI射击、坦克被击中和摧毁，两种子弹模拟方式的比赛过程完全相同
+    from headless import HeadlessRunner
+    outcomes = []
+    for numpy_bullets in (False, True):
+        random.seed(5)
+        runner = HeadlessRunner(max_ticks=1500, fire_rate=0.2, seed=5, numpy_bullets=numpy_bullets)
+        result = runner.run_match()
+        outcomes.append((result, runner.engine.get_game_state()))
+    assert outcomes[1] == outcomes[0]
+    assert any(tank["health"] < 100 for tank in outcomes[0][1]["tanks"])
@@ -0,0 +1,139 @@
+# game_engine.GameEngine的绘制与模拟测试
+import random
+
+import pygame
+
+from game_engine import GameEngine, Tank
+from settings import Settings
+
+SIZE = (950, 650)
+
+
+def frame_bytes(surface):
+    return pygame.image.tobytes(surface, "RGB")
+
+
+def test_draw_dirty_matches_full_draw():
+    pygame.display.init()
+    random.seed(3)
+    engine = GameEngine()
+    engine.init_game({"a": {}, "b": {}, "c": {}}, "a")
+    full = pygame.Surface(SIZE)
+    dirty = pygame.Surface(SIZE)
+    for i in range(300):
+        if i == 100:
+            # 被摧毁的坦克在两种绘制方式下都应一致
+            tank = engine.get_tank("c")
+            tank.health = 0
+            tank.active = False
+        if random.random() < 0.2:
+            engine.handle_shoot(random.choice(["a", "b"]))
+        engine.get_tank("a").move(random.choice(["up", "down", "left", "right"]))
+        engine.update()
+        engine.draw(full)
+        engine.draw_dirty(dirty)
+        assert frame_bytes(full) == frame_bytes(dirty), f"第{i}帧不一致"
+
+
+def grid_engine(row):
+    """
+    只有一行格子的地图，row为各列的材质编号
+    """
+    pygame.display.init()
+    engine = GameEngine()
+    engine.load_map([row])
+    return engine
+
+
+def test_weed_blocks_bullets_but_not_tanks():
+    engine = grid_engine([0, Settings.WEED_WALL, Settings.IRON_WALL])
+    assert not engine.is_solid(0, 0) and engine.is_solid(1, 0) and engine.is_solid(2, 0)
+    assert not engine.is_solid(3, 0) and not engine.is_solid(0, 1)
+    assert engine.blocks_bullets(1, 0) and not engine.blocks_tanks(1, 0)
+    assert engine.blocks_bullets(2, 0) and engine.blocks_tanks(2, 0)
+
+    tank = Tank(10, 10, "a", "a")
+    tank.speed = 20
+    tank.move("right")
+    assert not engine._tank_blocked(tank, 10, 10)
+    tank.rect.x = 70
+    tank.move("right")
+    assert engine._tank_blocked(tank, 70, 10)
+
+
+def test_aim_direction_needs_line_of_sight():
+    size = Settings.BOX_SIZE
+    engine = grid_engine([0, 0, 0, Settings.IRON_WALL, 0])
+    shooter = Tank(10, 10, "a", "a", is_ai=True)
+    fellow = Tank(size + 10, 10, "e", "e", is_ai=True)
+    near = Tank(size * 2 + 10, 10, "b", "b")
+    behind_wall = Tank(size * 4 + 10, 10, "c", "c")
+    below = Tank(10, size * 3, "d", "d")
+    engine.tanks = [shooter, behind_wall, below]
+    assert engine.aim_direction(shooter) == "down"
+    engine.tanks.append(near)
+    assert engine.aim_direction(shooter) == "right"
+    engine.tanks = [shooter, behind_wall]
+    assert engine.aim_direction(shooter) is None
+    # 其他AI坦克不是敌方
+    engine.tanks = [shooter, fellow]
+    assert engine.aim_direction(shooter) is None
+
+
+def run_seeded(seed, steps, frames):
+    """
+    由AI控制的四辆坦克，每30帧全部尝试射击一次，返回每30帧的游戏状态
+    """
+    pygame.display.init()
+    random.seed(seed)
+    engine = GameEngine()
+    engine.init_game({f"p{i}": {} for i in range(4)}, None)
+    for tank in engine.tanks:
+        tank.is_ai = True
+    states = []
+    for frame in range(0, frames, steps):
+        if frame % 30 == 0:
+            for tank in engine.tanks:
+                engine.handle_shoot(tank.player_id)
+            states.append(engine.get_game_state())
+        engine.update(steps)
+    states.append(engine.get_game_state())
+    return states
+
+
+def test_multi_frame_update_matches_single_frames():
+    for seed in range(8):
+        single = run_seeded(seed, 1, 1800)
+        for steps in (2, 3):
+            assert run_seeded(seed, steps, 1800) == single, f"seed={seed} steps={steps}"
+
+
+def test_draw_dirty_matches_full_draw_under_weed():
+    size = Settings.BOX_SIZE
+    engine = grid_engine([0, Settings.WEED_WALL, Settings.WEED_WALL, 0])
+    # 两辆坦克在草上来回移动，前后两帧的区域互相重叠
+    engine.tanks = [Tank(size, 5, "a", "a"), Tank(size + 15, 10, "b", "b")]
+    full = pygame.Surface(SIZE)
+    dirty = pygame.Surface(SIZE)
+    for i in range(40):
+        for tank in engine.tanks:
+            tank.move("right" if i % 20 < 10 else "left")
+        engine.draw(full)
+        engine.draw_dirty(dirty)
+        assert frame_bytes(full) == frame_bytes(dirty), f"第{i}帧不一致"
+
+
+def test_set_game_state_reinitialises_reused_bullets():
+    pygame.display.init()
+    engine = GameEngine()
+    engine.init_game({"a": {}, "b": {}}, "a")
+    old = engine.bullets.spawn(400, 300, "up", "a")
+    old.lifetime = 2
+    old.speed = 1
+    engine.set_game_state({"bullets": [
+        {"x": 100, "y": 300, "direction": "right", "owner_id": "b"}]})
+    bullet = engine.bullets[0]
+    assert (bullet.lifetime, bullet.speed, bullet.direction) == (60, 6, "right")
+    for _ in range(3):
+        bullet.update()
+    assert bullet.active and bullet.rect.x == 118
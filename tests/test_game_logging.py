@@ -0,0 +1,37 @@
+# game_logging模块测试
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+SCRIPT = """
+import game_logging
+logger = game_logging.get_logger("game_engine")
+logger.warning("warning message")
+logger.error("error message")
+game_logging.get_logger("network_manager").critical("critical message")
+"""
+
+
+def run_with_log_env(spec):
+    env = dict(os.environ, TANKWAR_LOG=spec)
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return result.stderr
+
+
+def test_off_silences_module_loggers():
+    assert run_with_log_env("off") == ""
+
+
+def test_default_prints_warnings():
+    stderr = run_with_log_env("")
+    assert "warning message" in stderr
+    assert "critical message" in stderr
+
+
+def test_module_level_overrides_off():
+    stderr = run_with_log_env("off,game_engine=WARNING")
+    assert "warning message" in stderr
+    assert "critical message" not in stderr
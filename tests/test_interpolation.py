@@ -0,0 +1,55 @@
+# interpolation.RemoteClock的时钟偏移估计测试
+import random
+
+from interpolation import RemoteClock, SNAPSHOT_RATE
+
+
+class FakeClock:
+    def __init__(self):
+        self.time = 100.0
+
+    def __call__(self):
+        return self.time
+
+
+def run_clock(rate, seconds, jitter=0.03, seed=1):
+    """
+    房主时间按本地时间的rate倍前进，快照经过0~jitter秒的随机延迟到达，
+    返回每个快照到达时估计值与房主真实时间之差
+    """
+    rng = random.Random(seed)
+    local = FakeClock()
+    clock = RemoteClock(clock=local)
+    errors = []
+    for i in range(int(seconds * SNAPSHOT_RATE)):
+        sent = i / SNAPSHOT_RATE
+        local.time = 100.0 + sent + rng.uniform(0, jitter)
+        clock.observe(sent * rate)
+        errors.append(clock.now() - (local.time - 100.0) * rate)
+    return errors
+
+
+def test_jitter_does_not_move_clock_forward_or_back_much():
+    errors = run_clock(1.0, 30)
+    assert all(-0.03 <= error <= 0.001 for error in errors)
+
+
+def test_clock_follows_slow_host():
+    # 房主实际帧率比Settings.FPS低5%：只取最小偏移时估计值会越来越超前
+    errors = run_clock(0.95, 60)
+    assert max(abs(error) for error in errors[-SNAPSHOT_RATE * 10:]) < 0.04
+
+
+def test_clock_follows_fast_host():
+    errors = run_clock(1.05, 60)
+    assert max(abs(error) for error in errors[-SNAPSHOT_RATE * 10:]) < 0.04
+
+
+def test_reset_forgets_offset():
+    local = FakeClock()
+    clock = RemoteClock(clock=local)
+    clock.observe(5.0)
+    clock.reset()
+    assert clock.now() is None
+    clock.observe(1.0)
+    assert clock.now() == 1.0
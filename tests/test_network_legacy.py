@@ -0,0 +1,67 @@
+# network_legacy.NetworkManager的旧版接口测试
+import json
+import socket
+import threading
+
+from framing import encode_length_prefixed
+from network_legacy import NetworkManager
+
+
+def test_send_and_receive_message_on_socket():
+    manager = NetworkManager("测试")
+    left, right = socket.socketpair()
+    try:
+        message = {"type": "chat", "text": "你好" * 3000}
+        assert manager.send_message(left, message)
+        assert manager.receive_message(right) == message
+        left.close()
+        assert manager.receive_message(right) is None
+    finally:
+        left.close()
+        right.close()
+        manager.stop()
+
+
+def test_receive_message_partial_and_multiple_frames():
+    manager = NetworkManager("测试")
+    left, right = socket.socketpair()
+    messages = [{"n": i, "name": "玩家"} for i in range(3)]
+    data = b"".join(encode_length_prefixed(json.dumps(message, ensure_ascii=False).encode())
+                    for message in messages)
+    # 第一帧在"玩"字的UTF-8编码中间断开，其余的帧一次到达
+    split = data.index("玩".encode()) + 1
+    sender = threading.Timer(0.05, left.sendall, (data[split:],))
+    try:
+        left.sendall(data[:split])
+        sender.start()
+        assert [manager.receive_message(right) for _ in messages] == messages
+    finally:
+        sender.join()
+        left.close()
+        right.close()
+        manager.stop()
+
+
+def test_message_handler_called_without_polling():
+    host = NetworkManager("房主")
+    client = NetworkManager("玩家")
+    joined = threading.Event()
+    received = []
+
+    def on_message(message):
+        received.append(message)
+        if message.get("type") == "player_joined":
+            joined.set()
+
+    host.set_message_handler(on_message)
+    try:
+        success, _ = host.create_room("房间")
+        assert success
+        success, reason = client.connect_to_host("127.0.0.1", host.port)
+        assert success, reason
+        assert joined.wait(5.0)
+        assert received[0]["peer_id"] == client.peer_id
+        assert host.get_messages() == []
+    finally:
+        client.stop()
+        host.stop()
@@ -0,0 +1,160 @@
+# network_manager.NetworkManager的UDP通道测试（本机回环）
+import json
+import socket
+import threading
+import time
+
+from network_manager import NetworkManager, UDP_HELLO_INTERVAL
+from udp_channel import PACKET_STATE, pack_packet, unpack_packet
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as tcp:
+        tcp.bind(("127.0.0.1", 0))
+        return tcp.getsockname()[1]
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def receive_hellos(udp, duration):
+    hellos = []
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        udp.settimeout(max(0.01, deadline - time.monotonic()))
+        try:
+            data, addr = udp.recvfrom(65536)
+        except socket.timeout:
+            break
+        _, _, payload = unpack_packet(data)
+        if payload.get("type") == "udp_hello":
+            hellos.append((payload, addr))
+    return hellos
+
+
+def test_udp_hello_resent_until_first_state_packet():
+    port = free_port()
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    udp = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", port))
+    server.listen(1)
+    udp.bind(("127.0.0.1", port))
+    client = NetworkManager("玩家")
+    try:
+        assert client.connect("127.0.0.1", port)
+        conn, _ = server.accept()
+        conn.sendall(json.dumps({"type": "connection_established", "host_id": "房主",
+                                 "peer_id": None, "udp_token": 7}).encode() + b"\n")
+
+        # 模拟第一个udp_hello丢失：房主不回应时客户端持续重发
+        hellos = receive_hellos(udp, UDP_HELLO_INTERVAL * 4)
+        assert len(hellos) >= 2
+        assert all(payload["token"] == 7 for payload, _ in hellos)
+
+        udp.sendto(pack_packet(PACKET_STATE, 1, b"state"), hellos[-1][1])
+        assert wait_for(lambda: client.udp_confirmed)
+        receive_hellos(udp, UDP_HELLO_INTERVAL)
+        assert receive_hellos(udp, UDP_HELLO_INTERVAL * 3) == []
+        conn.close()
+    finally:
+        client.disconnect()
+        server.close()
+        udp.close()
+
+
+def test_host_addresses_each_client_separately():
+    host = NetworkManager("房主")
+    host.local_ip = "127.0.0.1"
+    host.local_port = free_port()
+    clients = [NetworkManager(f"玩家{i}") for i in range(2)]
+    try:
+        assert host.start_server()
+        for client in clients:
+            assert client.connect("127.0.0.1", host.local_port)
+        assert wait_for(lambda: len(host.udp_addrs) == 2)
+
+        peers = host.peers()
+        assert len(peers) == 2
+        for peer in peers:
+            assert host.send_unreliable(b"state %d" % peer, PACKET_STATE, peer)
+        received = [[] for _ in clients]
+
+        def snapshots_arrived():
+            for messages, client in zip(received, clients):
+                messages.extend(m["payload"] for m in client.get_messages()
+                                if m.get("type") == "snapshot")
+            return all(received)
+
+        assert wait_for(snapshots_arrived)
+        assert sorted(messages[0] for messages in received) == \
+            sorted(b"state %d" % peer for peer in peers)
+
+        # 客户端的确认消息带有房主端的连接编号
+        clients[0].send_unreliable({"type": "snapshot_ack", "seq": 1})
+        acks = []
+        assert wait_for(lambda: acks.extend(host.get_messages()) or
+                        any(m.get("type") == "snapshot_ack" for m in acks))
+        ack = next(m for m in acks if m.get("type") == "snapshot_ack")
+        assert ack["peer"] in peers
+        assert host.send_unreliable(b"x", PACKET_STATE, 12345) is False
+    finally:
+        for client in clients:
+            client.disconnect()
+        host.disconnect()
+
+
+def test_concurrent_flushes_keep_message_order():
+    port = free_port()
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", port))
+    server.listen(1)
+    client = NetworkManager("玩家", flush_interval=None)
+    count = 200
+    try:
+        assert client.connect("127.0.0.1", port)
+        conn, _ = server.accept()
+        stop = threading.Event()
+
+        def flush_loop():
+            while not stop.is_set():
+                client.flush()
+
+        flusher = threading.Thread(target=flush_loop)
+        encode = client.transport.encode
+
+        def slow_encode(message):
+            # 放慢另一个线程的编码，让两个线程的flush()交错
+            if threading.current_thread() is flusher:
+                time.sleep(0.001)
+            return encode(message)
+
+        client.transport.encode = slow_encode
+        flusher.start()
+        try:
+            for i in range(count):
+                client.send_message({"type": "chat", "n": i})
+                time.sleep(0)
+                client.flush()
+        finally:
+            stop.set()
+            flusher.join()
+        client.flush()
+
+        data = b""
+        conn.settimeout(5.0)
+        while data.count(b"\n") < count:
+            chunk = conn.recv(65536)
+            assert chunk
+            data += chunk
+        numbers = [json.loads(line)["n"] for line in data.splitlines()]
+        assert numbers == list(range(count))
+        conn.close()
+    finally:
+        client.disconnect()
+        server.close()
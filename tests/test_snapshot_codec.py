@@ -0,0 +1,71 @@
+# snapshot_codec模块测试
+import pytest
+
+from snapshot_codec import (BULLET, COUNT, FIELD_X, HEADER, SHORT, TANK_HEAD, VERSION,
+                            SnapshotDecoder, SnapshotEncoder)
+
+
+def game_state(x=50, bullets=1, destroyed=((1, 1),)):
+    return {
+        "tanks": [
+            {"id": "host", "x": x, "y": 60, "health": 100, "direction": "up", "input_seq": 3},
+            {"id": "client", "x": 800, "y": 500, "health": 75, "direction": "left"}
+        ],
+        "bullets": [{"x": 100 + i, "y": 200, "direction": "right", "owner_id": "host"}
+                    for i in range(bullets)],
+        "destroyed_walls": [list(tile) for tile in destroyed],
+        "frame": 120,
+        "game_over": True,
+        "winner_id": "host"
+    }
+
+
+def test_round_trip():
+    encoder = SnapshotEncoder()
+    decoder = SnapshotDecoder()
+    seq, state = decoder.decode(encoder.encode(game_state()))
+    assert seq == 1
+    assert state["tanks"][0] == {"id": "host", "x": 50, "y": 60, "health": 100,
+                                 "direction": "up", "input_seq": 3}
+    assert state["bullets"] == [{"x": 100, "y": 200, "direction": "right", "owner_id": "host"}]
+    assert state["destroyed_walls"] == [(1, 1)]
+    assert state["winner_id"] == "host"
+
+
+def test_truncated_packets_raise_value_error():
+    data = SnapshotEncoder().encode(game_state(bullets=3))
+    for length in range(len(data)):
+        decoder = SnapshotDecoder()
+        with pytest.raises(ValueError):
+            decoder.decode(data[:length])
+        # 损坏的数据包不影响之后的解码
+        assert decoder.latest_seq == 0
+        assert decoder.decode(data)[0] == 1
+
+
+def test_malformed_packets_raise_value_error():
+    data = SnapshotEncoder().encode(game_state())
+    header = HEADER.pack(VERSION, 1, 0, 0, 0)
+    empty = COUNT.pack(0)
+    packets = [
+        # 末尾多余的字节
+        data + b"\x00",
+        # 增量字段引用了未出现过的坦克槽位
+        header + COUNT.pack(1) + TANK_HEAD.pack(5, FIELD_X) + SHORT.pack(1) + empty + empty,
+        # 未知的子弹方向
+        header + empty + COUNT.pack(1) + BULLET.pack(1, 2, 9, 0) + empty,
+    ]
+    for packet in packets:
+        decoder = SnapshotDecoder()
+        with pytest.raises(ValueError):
+            decoder.decode(packet)
+        assert decoder.latest_seq == 0
+
+
+def test_unknown_baseline_raises_value_error():
+    encoder = SnapshotEncoder()
+    encoder.encode(game_state())
+    encoder.acknowledge(1)
+    decoder = SnapshotDecoder()
+    with pytest.raises(ValueError):
+        decoder.decode(encoder.encode(game_state(x=70)))
@@ -0,0 +1,48 @@
+# UIManager字体查找与磁盘缓存测试
+import json
+import os
+
+import pygame
+
+import fonts
+from constants import FONT_SIZE
+from ui_manager import UIManager
+
+DEFAULT_FONT = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+
+
+def fake_match_font(found, calls):
+    def match_font(name):
+        calls.append(name)
+        return found.get(name)
+    return match_font
+
+
+def test_font_path_is_cached_and_reused(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "fonts.json")
+    calls = []
+    monkeypatch.setattr(pygame.font, "match_font", fake_match_font({"B": DEFAULT_FONT}, calls))
+    ui = UIManager(None, ["A", "B"], cache_file)
+    # 按match_font找到的字体文件创建字体
+    assert ui.font is fonts.get_font(DEFAULT_FONT, FONT_SIZE)
+    assert calls == ["A", "B"]
+    with open(cache_file, encoding="utf-8") as f:
+        assert json.load(f) == {"fonts": "A|B", "font": "B", "path": DEFAULT_FONT}
+
+    # 再次启动直接使用缓存的路径，不再查找系统字体
+    calls.clear()
+    assert UIManager(None, ["A", "B"], cache_file)._discover_font() == DEFAULT_FONT
+    assert calls == []
+
+
+def test_missing_cached_font_file_is_rediscovered(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "fonts.json")
+    with open(cache_file, "w", encoding="utf-8") as f:
+        json.dump({"fonts": "A|B", "font": "A", "path": str(tmp_path / "gone.ttf")}, f)
+    calls = []
+    monkeypatch.setattr(pygame.font, "match_font", fake_match_font({"B": DEFAULT_FONT}, calls))
+    ui = UIManager(None, ["A", "B"], cache_file)
+    assert ui._discover_font() == DEFAULT_FONT
+    assert calls == ["A", "B"]
+    with open(cache_file, encoding="utf-8") as f:
+        assert json.load(f)["path"] == DEFAULT_FONT
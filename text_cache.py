@@ -0,0 +1,53 @@
+# 文字渲染缓存模块，缓存font.render()的结果
+#
+# 菜单、大厅等界面每帧都绘制同样的文字，中文字形渲染代价较高。
+# 渲染结果按 (文字, 字体, 颜色, 抗锯齿) 缓存，超过容量时淘汰最久未使用的条目。
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 256
+
+
+class TextCache:
+    """
+    有容量上限的LRU文字Surface缓存
+    """
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, antialias, color):
+        """
+        与font.render(text, antialias, color)相同，返回的Surface被共享，调用方不应修改
+        """
+        key = (text, font, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def stats(self):
+        """
+        返回命中次数、未命中次数、命中率和当前条目数
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self.surfaces)
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
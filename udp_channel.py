@@ -0,0 +1,74 @@
+# UDP不可靠通道的数据包格式，用于每帧的位置/输入/状态同步
+#
+# 数据包 = 头部(版本, 类型, 序号) + 负载
+#   - 类型带KIND_JSON标志时负载为UTF-8 JSON，否则为原始字节（例如二进制快照）
+#   - 序号按 (发送方地址, 类型) 单调递增，接收方丢弃比已收到的更旧的包
+import json
+import struct
+
+VERSION = 1
+
+HEADER = struct.Struct("!BBI")
+
+# 数据包类型
+PACKET_STATE = 1  # 游戏状态快照（房主 -> 客户端）
+PACKET_INPUT = 2  # 位置/输入（客户端 -> 房主，或反向）
+KIND_JSON = 0x80
+
+SEQ_MASK = 0xFFFFFFFF
+SEQ_HALF = 0x80000000
+
+
+def pack_packet(kind, seq, payload):
+    """
+    打包数据包，payload为bytes或可JSON序列化的对象
+    """
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return HEADER.pack(VERSION, kind, seq & SEQ_MASK) + bytes(payload)
+    data = json.dumps(payload).encode("utf-8")
+    return HEADER.pack(VERSION, kind | KIND_JSON, seq & SEQ_MASK) + data
+
+
+def unpack_packet(data):
+    """
+    解包数据包，返回 (类型, 序号, 负载)；格式错误时抛出ValueError
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("数据包过短")
+    version, kind, seq = HEADER.unpack_from(data, 0)
+    if version != VERSION:
+        raise ValueError(f"不支持的数据包版本: {version}")
+    payload = data[HEADER.size:]
+    if kind & KIND_JSON:
+        try:
+            payload = json.loads(bytes(payload).decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError(f"无效的JSON负载: {e}")
+    return kind & ~KIND_JSON, seq, payload
+
+
+def is_newer(seq, last_seq):
+    """
+    按32位序号回绕规则判断seq是否比last_seq新
+    """
+    return 0 < ((seq - last_seq) & SEQ_MASK) < SEQ_HALF
+
+
+class SequenceFilter:
+    """
+    过期包过滤器，每个 (发送方, 类型) 只接受比上一次更新的序号
+    """
+    def __init__(self):
+        self.last_seq = {}
+        self.dropped = 0
+
+    def accept(self, key, seq):
+        last_seq = self.last_seq.get(key)
+        if last_seq is not None and not is_newer(seq, last_seq):
+            self.dropped += 1
+            return False
+        self.last_seq[key] = seq
+        return True
+
+    def reset(self):
+        self.last_seq.clear()
@@ -1,41 +1,105 @@
 # UI管理模块，负责游戏界面渲染和交互处理
+import json
+import os
+
 import pygame
 from constants import *
+import fonts
+from game_logging import get_logger
+
+logger = get_logger("ui_manager")
+
+# 支持中文的字体，按优先级排序
+CHINESE_FONTS = ['SimHei', 'Microsoft YaHei', 'SimSun', 'WenQuanYi Micro Hei', 'Heiti TC']
+# 字体查找结果（字体文件路径）的磁盘缓存，避免每次启动都逐个探测系统字体
+FONT_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "tankwar", "fonts.json")
 
 class UIManager:
-    def __init__(self, screen):
+    def __init__(self, screen, font_names=CHINESE_FONTS, font_cache_file=FONT_CACHE_FILE):
         self.screen = screen
         # 初始化字体
         pygame.font.init()
         
-        # 尝试使用支持中文的字体
-        # 字体列表按优先级排序，确保至少有一个可用字体
-        chinese_fonts = ['SimHei', 'Microsoft YaHei', 'SimSun', 'WenQuanYi Micro Hei', 'Heiti TC']
+        # 字体在第一次使用时才查找和创建
+        self.font_names = list(font_names)
+        self.font_cache_file = font_cache_file
+        self._font_name = None
+        self._font_path = None
+        self._font_discovered = False
+        
+        # 文字渲染缓存（与游戏画面共享），静态界面每帧绘制的文字只渲染一次
+        self.text_cache = fonts.TEXT_CACHE
+    
+    @property
+    def font(self):
+        return self._get_font(FONT_SIZE)
+    
+    @property
+    def small_font(self):
+        return self._get_font(FONT_SIZE_SMALL)
+    
+    @property
+    def large_font(self):
+        return self._get_font(FONT_SIZE_LARGE)
+    
+    def _get_font(self, size):
+        """
+        获取指定大小的字体，第一次使用某个大小时才创建
+        """
+        return fonts.get_font(self._discover_font(), size)
+    
+    def _discover_font(self):
+        """
+        查找第一个可用的中文字体，返回字体文件路径，找不到时返回None（pygame默认字体）
+        结果按字体列表缓存到磁盘，之后的启动直接按路径打开字体
+        """
+        if self._font_discovered:
+            return self._font_path
+        self._font_discovered = True
         
-        # 初始化不同大小的字体
-        self.font = self._get_font(chinese_fonts, FONT_SIZE)
-        self.small_font = self._get_font(chinese_fonts, FONT_SIZE_SMALL)
-        self.large_font = self._get_font(chinese_fonts, FONT_SIZE_LARGE)
+        key = "|".join(self.font_names)
+        cached = self._load_font_cache(key)
+        if cached is not None:
+            self._font_name, self._font_path = cached.get("font"), cached["path"]
+        else:
+            # match_font只查询字体文件路径，不需要创建Font对象和渲染测试文字
+            for name in self.font_names:
+                path = pygame.font.match_font(name)
+                if path:
+                    self._font_name, self._font_path = name, path
+                    break
+            self._save_font_cache(key, self._font_name, self._font_path)
+        
+        if self._font_path:
+            logger.info("使用字体: %s (%s)", self._font_name, self._font_path)
+        else:
+            logger.info("未找到中文字体，使用系统默认字体")
+        return self._font_path
+    
+    def _load_font_cache(self, key):
+        """
+        读取字体缓存，缓存不存在、字体列表不同或缓存的字体文件已不存在时返回None
+        """
+        try:
+            with open(self.font_cache_file, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict) or cached.get("fonts") != key or "path" not in cached:
+            return None
+        path = cached["path"]
+        if path is not None and not os.path.isfile(path):
+            logger.info("缓存的字体文件 %s 已不存在，重新查找字体", path)
+            return None
+        return cached
     
-    def _get_font(self, font_names, size):
-        """
-        获取可用的字体，如果指定字体不可用则回退到系统默认字体
-        """
-        # 首先尝试获取指定的中文字体
-        for font_name in font_names:
-            try:
-                font = pygame.font.SysFont(font_name, size)
-                # 测试是否能渲染中文
-                test_surface = font.render("测试", True, WHITE)
-                if test_surface.get_width() > 0:  # 确保能正常渲染
-                    print(f"使用字体: {font_name}, 大小: {size}")
-                    return font
-            except Exception as e:
-                print(f"字体 {font_name} 不可用: {e}")
-        
-        # 如果所有指定字体都不可用，使用系统默认字体
-        print(f"使用系统默认字体，大小: {size}")
-        return pygame.font.SysFont(None, size)
+    def _save_font_cache(self, key, name, path):
+        try:
+            os.makedirs(os.path.dirname(self.font_cache_file), exist_ok=True)
+            with open(self.font_cache_file, "w", encoding="utf-8") as f:
+                json.dump({"fonts": key, "font": name, "path": path}, f, ensure_ascii=False)
+        except OSError as e:
+            logger.debug("无法写入字体缓存 %s: %s", self.font_cache_file, e)
     
     def draw_text(self, text, x, y, color=WHITE, font=None, center=True):
         """
@@ -43,7 +107,7 @@ class UIManager:
         """
         if font is None:
             font = self.font
-        text_surface = font.render(text, True, color)
+        text_surface = self.text_cache.render(font, text, True, color)
         text_rect = text_surface.get_rect()
         if center:
             text_rect.center = (x, y)